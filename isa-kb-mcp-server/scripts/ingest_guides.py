@@ -35,6 +35,7 @@ import re
 import sys
 import time
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
@@ -82,6 +83,10 @@ class GuideSection:
     char_offset: int = 0
 
     def __post_init__(self) -> None:
+        # Sections share a handful of document names and ISA references:
+        # keep one copy of each string instead of one per section
+        self.source_doc = sys.intern(self.source_doc)
+        self.isa_references = [sys.intern(ref) for ref in self.isa_references]
         if not self.id:
             self.id = _section_id(self.source_doc, self.heading, self.char_offset)
 
@@ -164,20 +169,28 @@ def _section_id(source_doc: str, heading: str, char_offset: int = 0) -> str:
     return f"gs_{h}"
 
 
-# ISA reference regex: matches ISA 315, ISA 315.12, ISA 315.12(a), ISA 315.12.A2
+# ISA reference regex: matches ISA 315, ISA 315.12, ISA 315.12(a), ISA 315.12.A2.
+# The single group is the reference after the (normalized) whitespace.
 _ISA_REF_PATTERN = re.compile(
-    r"ISA\s+(\d{3})(?:\.(\d+))?(?:\(([a-z])\))?(?:\.(A\d+))?"
+    r"ISA\s+(\d{3}(?:\.\d+)?(?:\([a-z]\))?(?:\.A\d+)?)"
 )
 
-# Heading detection patterns (common in audit guides)
-_HEADING_PATTERNS = [
-    re.compile(r"^#{1,6}\s+(.+)$", re.MULTILINE),
-    re.compile(
-        r"^(?:Chapter|Section|Part)\s+\d+[:.]\s*(.+)$",
-        re.MULTILINE | re.IGNORECASE,
-    ),
-    re.compile(r"^\d+\.\d*\s+([A-Z].{5,80})$", re.MULTILINE),
-]
+# Heading detection (common in audit guides), one alternative per style:
+#   1. markdown "# Title"
+#   2. "Chapter 3: Title" / "Section 3. Title" / "Part 3: Title"
+#   3. numbered "3.1 Title"
+# All styles are found in one scan. Each match is the newline before a
+# heading plus a lookahead; group N holds the heading text of style N.
+# Matching on the literal "\n" (rather than a MULTILINE "^") lets re skip
+# ahead to the next line instead of trying every character position.
+_HEADING_RE = re.compile(
+    r"\n(?="
+    r"(#{1,6}\s+.+$)"
+    r"|((?i:Chapter|Section|Part)\s+\d+[:.]\s*.+$)"
+    r"|(\d+\.\d*\s+[A-Z].{5,80}$)"
+    r")",
+    re.MULTILINE,
+)
 
 _MIN_SECTION_LENGTH = 50
 _MAX_SECTION_LENGTH = 3000
@@ -189,17 +202,10 @@ def extract_isa_references(text: str) -> list[str]:
     Returns sorted list of unique ISA reference strings like
     "ISA 315.12(a)", "ISA 500".
     """
-    refs: set[str] = set()
-    for m in _ISA_REF_PATTERN.finditer(text):
-        ref = f"ISA {m.group(1)}"
-        if m.group(2):
-            ref += f".{m.group(2)}"
-        if m.group(3):
-            ref += f"({m.group(3)})"
-        if m.group(4):
-            ref += f".{m.group(4)}"
-        refs.add(ref)
-    return sorted(refs)
+    matches = _ISA_REF_PATTERN.findall(text)
+    if not matches:
+        return []
+    return sorted({"ISA " + ref for ref in matches})
 
 
 def split_into_sections(
@@ -217,19 +223,22 @@ def split_into_sections(
     if not text or not text.strip():
         return []
 
-    # Find heading positions
+    # Find heading positions in order, deduplicating nearby headings.
+    # A heading may span lines (its whitespace can cross newlines); a later
+    # heading of the same style starting inside that span is skipped, as a
+    # per-style scan would never have matched it.
+    # The scan runs over "\n" + text so the first line has a newline
+    # too; offsets are shifted back by one.
     headings: list[tuple[int, str]] = []
-    for pattern in _HEADING_PATTERNS:
-        for m in pattern.finditer(text):
-            headings.append((m.start(), m.group(0).strip()))
-
-    # Sort by position and deduplicate nearby headings
-    headings.sort(key=lambda x: x[0])
-    deduped: list[tuple[int, str]] = []
-    for pos, heading in headings:
-        if not deduped or pos - deduped[-1][0] > 20:
-            deduped.append((pos, heading))
-    headings = deduped
+    style_end = [0, 0, 0, 0]
+    for m in _HEADING_RE.finditer("\n" + text):
+        style = m.lastindex
+        if m.start(style) < style_end[style]:
+            continue
+        style_end[style] = m.end(style)
+        pos = m.start(style) - 1
+        if not headings or pos - headings[-1][0] > 20:
+            headings.append((pos, m.group(style).strip()))
 
     # If no headings found, treat entire text as one section
     if not headings:
@@ -491,10 +500,12 @@ async def embed_sections(
     *,
     debug: bool = False,
     batch_size: int = 128,
+    concurrency: int = 4,
 ) -> list[GuideSection]:
     """Compute embeddings for all sections using Voyage AI.
 
-    In debug mode, generates deterministic fake vectors.
+    In debug mode, generates deterministic fake vectors. Otherwise up to
+    ``concurrency`` batches of ``batch_size`` texts are embedded at once.
     """
     if debug:
         logger.info("[EMBED] Debug mode -- generating fake vectors")
@@ -516,38 +527,50 @@ async def embed_sections(
     client = voyageai.Client(api_key=api_key)
 
     texts = [s.enriched_content for s in sections]
-    logger.info("[EMBED] Embedding %d sections (batch_size=%d)", len(texts), batch_size)
+    logger.info(
+        "[EMBED] Embedding %d sections (batch_size=%d, concurrency=%d)",
+        len(texts), batch_size, concurrency,
+    )
+
+    # Batches are independent: keep up to `concurrency` Voyage calls in
+    # flight (the sync client runs in worker threads) and reassemble in order
+    semaphore = asyncio.Semaphore(concurrency)
 
-    all_embeddings: list[list[float]] = []
-    for i in range(0, len(texts), batch_size):
+    async def _embed_batch(i: int) -> list[list[float]]:
         batch = texts[i : i + batch_size]
         retries = 0
         max_retries = 3
 
-        while retries < max_retries:
-            try:
-                result = client.embed(
-                    batch, model="voyage-law-2", input_type="document"
-                )
-                all_embeddings.extend(result.embeddings)
-                break
-            except Exception as e:
-                retries += 1
-                if retries >= max_retries:
-                    raise RuntimeError(
-                        f"Voyage AI embedding failed after {max_retries} retries: {e}"
-                    ) from e
-                wait = 2**retries
-                logger.warning(
-                    "[EMBED] Retry %d/%d after %.1fs: %s", retries, max_retries, wait, e
-                )
-                await asyncio.sleep(wait)
+        async with semaphore:
+            while True:
+                try:
+                    result = await asyncio.to_thread(
+                        client.embed, batch, model="voyage-law-2", input_type="document"
+                    )
+                    break
+                except Exception as e:
+                    retries += 1
+                    if retries >= max_retries:
+                        raise RuntimeError(
+                            f"Voyage AI embedding failed after {max_retries} retries: {e}"
+                        ) from e
+                    wait = 2**retries
+                    logger.warning(
+                        "[EMBED] Retry %d/%d after %.1fs: %s", retries, max_retries, wait, e
+                    )
+                    await asyncio.sleep(wait)
 
         logger.info(
             "[EMBED] Batch %d/%d complete",
             min(i + batch_size, len(texts)),
             len(texts),
         )
+        return result.embeddings
+
+    batches = await asyncio.gather(
+        *(_embed_batch(i) for i in range(0, len(texts), batch_size))
+    )
+    all_embeddings = [emb for batch in batches for emb in batch]
 
     for section, emb in zip(sections, all_embeddings):
         section.embedding = emb
@@ -584,16 +607,29 @@ async def store_in_duckdb(
     if schema_path.exists():
         conn.execute(schema_path.read_text(encoding="utf-8"))
 
-    count = 0
-    for s in sections:
-        enriched = getattr(s, "enriched_content", s.content)
-        conn.execute(
-            "INSERT OR REPLACE INTO GuideSection "
-            "(id, heading, content, enriched_content, embedding, source_doc) "
-            "VALUES (?, ?, ?, ?, ?, ?)",
-            [s.id, s.heading, s.content, enriched, s.embedding, s.source_doc],
-        )
-        count += 1
+    import pyarrow as pa
+
+    # Insert all sections as one Arrow batch built column by column,
+    # instead of one statement per section. Later duplicates of an id win,
+    # as they did with row-by-row INSERT OR REPLACE.
+    unique = list({s.id: s for s in sections}.values())
+    rows = pa.table({
+        "id": [s.id for s in unique],
+        "heading": [s.heading for s in unique],
+        "content": [s.content for s in unique],
+        "enriched_content": [getattr(s, "enriched_content", s.content) for s in unique],
+        "embedding": pa.array([s.embedding for s in unique], type=pa.list_(pa.float32())),
+        "source_doc": [s.source_doc for s in unique],
+    })
+    conn.register("guide_section_rows", rows)
+    conn.execute(
+        "INSERT OR REPLACE INTO GuideSection "
+        "(id, heading, content, enriched_content, embedding, source_doc) "
+        "SELECT id, heading, content, enriched_content, embedding, source_doc "
+        "FROM guide_section_rows"
+    )
+    conn.unregister("guide_section_rows")
+    count = len(sections)
 
     # Create FTS index on GuideSection
     try:
@@ -608,6 +644,39 @@ async def store_in_duckdb(
     return {"guide_sections": count}
 
 
+# Same threshold and index settings as ingest_isa.py
+_ANN_MIN_ROWS = 10_000
+
+
+def _ensure_vector_index(table: Any, table_name: str) -> None:
+    """(Re)build the IVF_PQ index on ``vector`` once the table is large enough.
+
+    Rebuilt on every ingest so rows added by an upsert are indexed too.
+    Uses L2 distance, matching the runtime search and its confidence scale.
+    """
+    num_rows = table.count_rows()
+    if num_rows < _ANN_MIN_ROWS:
+        logger.info("[STORE-LANCE] %s has %d rows; skipping ANN index (flat scan)",
+                    table_name, num_rows)
+        return
+
+    dim = table.schema.field("vector").type.list_size
+    start = time.time()
+    try:
+        table.create_index(
+            metric="l2",
+            num_partitions=max(1, int(num_rows ** 0.5)),
+            num_sub_vectors=max(1, dim // 16),
+            vector_column_name="vector",
+            replace=True,
+        )
+    except Exception as e:
+        logger.warning("[STORE-LANCE] ANN index warning: %s", e)
+        return
+    logger.info("[STORE-LANCE] Built IVF_PQ index on %s (%d rows) in %.1fs",
+                table_name, num_rows, time.time() - start)
+
+
 async def store_in_lancedb(
     sections: list[GuideSection],
     *,
@@ -617,7 +686,7 @@ async def store_in_lancedb(
 
     Creates or appends to the 'guides' table with schema:
         { id, vector[1024], content, heading, source_doc,
-          isa_references, page_start, page_end }
+          isa_references: list<string>, page_start, page_end }
     """
     if skip:
         logger.info("[STORE-LANCE] Skipping LanceDB storage")
@@ -625,6 +694,7 @@ async def store_in_lancedb(
 
     import lancedb
     import pandas as pd
+    import pyarrow as pa
 
     lance_dir = DATA_DIR / "lancedb"
     db = lancedb.connect(str(lance_dir))
@@ -639,7 +709,7 @@ async def store_in_lancedb(
             "content": s.content,
             "heading": s.heading,
             "source_doc": s.source_doc,
-            "isa_references": json.dumps(s.isa_references),
+            "isa_references": list(s.isa_references),
             "page_start": s.page_start,
             "page_end": s.page_end,
         })
@@ -649,10 +719,20 @@ async def store_in_lancedb(
         return 0
 
     df = pd.DataFrame(records)
+    # Native list<string> so the server reads references without JSON parsing
+    # (explicit type: an all-empty column would otherwise infer as list<null>)
+    df["isa_references"] = pd.Series(
+        [r["isa_references"] for r in records],
+        dtype=pd.ArrowDtype(pa.list_(pa.string())),
+    )
 
     # Create or append to table
     try:
         table = db.open_table("guides")
+        refs_type = table.schema.field("isa_references").type
+        if pa.types.is_string(refs_type) or pa.types.is_large_string(refs_type):
+            # Table written before the list<string> column: keep its JSON strings
+            df["isa_references"] = [json.dumps(r["isa_references"]) for r in records]
         table.add(df)
     except Exception:
         db.create_table("guides", df)
@@ -664,6 +744,8 @@ async def store_in_lancedb(
     except Exception as e:
         logger.warning("[STORE-LANCE] FTS index warning: %s", e)
 
+    _ensure_vector_index(db.open_table("guides"), "guides")
+
     logger.info("[STORE-LANCE] Stored %d rows in guides", len(records))
     return len(records)
 
@@ -702,6 +784,16 @@ def _classify_hop_type(isa_ref: str) -> str:
     return "standard_ref"
 
 
+@lru_cache(maxsize=4096)
+def _hop_weight_and_type(isa_ref: str) -> tuple[float, str]:
+    """Weight and hop type of an ISA reference, memoized.
+
+    The same references recur across many guide sections, so each
+    distinct string is classified once per run.
+    """
+    return _compute_hop_weight(isa_ref), _classify_hop_type(isa_ref)
+
+
 def _resolve_isa_paragraph_id(conn: Any, isa_ref: str) -> str | None:
     """Resolve an ISA reference string to a paragraph ID in DuckDB.
 
@@ -812,8 +904,7 @@ async def build_hop_edges(
             if dst_id is None:
                 continue
 
-            weight = _compute_hop_weight(isa_ref)
-            hop_type = _classify_hop_type(isa_ref)
+            weight, hop_type = _hop_weight_and_type(isa_ref)
             query = f"{section.heading} {isa_ref}"
 
             edge_id = f"he_{hashlib.sha256(f'{section.id}{dst_id}{hop_type}'.encode()).hexdigest()[:8]}"
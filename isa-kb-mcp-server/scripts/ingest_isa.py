@@ -1035,6 +1035,39 @@ async def store_in_duckdb(
     return counts
 
 
+# Below this many rows a flat scan is fast and PQ training is unreliable
+_ANN_MIN_ROWS = 10_000
+
+
+def _ensure_vector_index(table: Any, table_name: str) -> None:
+    """(Re)build the IVF_PQ index on ``vector`` once the table is large enough.
+
+    Rebuilt on every ingest so rows added by an upsert are indexed too.
+    Uses L2 distance, matching the runtime search and its confidence scale.
+    """
+    num_rows = table.count_rows()
+    if num_rows < _ANN_MIN_ROWS:
+        logger.info("[STORE-LANCE] %s has %d rows; skipping ANN index (flat scan)",
+                    table_name, num_rows)
+        return
+
+    dim = table.schema.field("vector").type.list_size
+    start = time.time()
+    try:
+        table.create_index(
+            metric="l2",
+            num_partitions=max(1, int(num_rows ** 0.5)),
+            num_sub_vectors=max(1, dim // 16),
+            vector_column_name="vector",
+            replace=True,
+        )
+    except Exception as e:
+        logger.warning("[STORE-LANCE] ANN index warning: %s", e)
+        return
+    logger.info("[STORE-LANCE] Built IVF_PQ index on %s (%d rows) in %.1fs",
+                table_name, num_rows, time.time() - start)
+
+
 async def store_in_lancedb(
     paragraphs: list[ISAParagraph],
     *,
@@ -1109,6 +1142,8 @@ async def store_in_lancedb(
     except Exception as e:
         logger.warning("[STORE-LANCE] FTS index warning: %s", e)
 
+    _ensure_vector_index(db.open_table("isa_chunks"), "isa_chunks")
+
     logger.info("[STORE-LANCE] Stored %d rows in isa_chunks (upsert for ISA %s)",
                 len(records), ", ".join(isa_numbers))
     return len(records)
@@ -42,6 +42,7 @@ __version__ = "0.1.0"
 
 import logging
 import sys
+import threading
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 
@@ -63,8 +64,10 @@ async def _lifespan(server: FastMCP) -> AsyncIterator[dict[str, bool]]:
     Non-fatal failures are logged as warnings — the server starts
     even if the KB is not yet ingested.
     """
+    from isa_kb_mcp_server import graph, paragraphs, search, verify
     from isa_kb_mcp_server.db import close_connection, get_connection
     from isa_kb_mcp_server.vectors import close_vectors, init_vectors, is_vector_search_available
+    from isa_kb_mcp_server.web_search import close_web_search
 
     status: dict[str, bool] = {"duckdb": False, "lancedb": False, "voyage_ai": False}
 
@@ -94,9 +97,14 @@ async def _lifespan(server: FastMCP) -> AsyncIterator[dict[str, bool]]:
     try:
         yield status
     finally:
-        # Shutdown: close connections
+        # Shutdown: close connections and drop lookups memoized against them
         close_connection()
         close_vectors()
+        close_web_search()
+        graph.clear_caches()
+        paragraphs.clear_caches()
+        search.clear_caches()
+        verify.clear_caches()
         logger.info("ISA KB server shut down")
 
 
@@ -162,6 +170,7 @@ def create_server() -> FastMCP:
         decay: float = 0.7,
         min_score: float = 0.01,
         max_results: int = 30,
+        content_chars: int = 0,
     ) -> dict:
         """Retrieve connected ISA paragraphs via multi-hop graph traversal.
 
@@ -179,6 +188,8 @@ def create_server() -> FastMCP:
             decay: Score decay per hop (default 0.7). Lower = favor closer.
             min_score: Minimum score threshold for path pruning (default 0.01).
             max_results: Maximum connected paragraphs to return (default 30).
+            content_chars: Truncate each paragraph's content to this many
+                characters. Leave 0 for full content.
 
         Returns:
             Dict with seed_id, connected paragraphs (with hop_score,
@@ -190,6 +201,7 @@ def create_server() -> FastMCP:
             decay=decay,
             min_score=min_score,
             max_results=max_results,
+            content_chars=content_chars if content_chars > 0 else None,
         )
 
     @mcp.tool()
@@ -264,6 +276,7 @@ def create_server() -> FastMCP:
     def isa_guide_to_isa_hop(
         guide_section_id: str,
         max_hops: int = 2,
+        content_chars: int = 0,
     ) -> dict:
         """From a guide section, find connected ISA paragraphs via graph traversal.
 
@@ -277,6 +290,8 @@ def create_server() -> FastMCP:
         Args:
             guide_section_id: The guide section ID (e.g., "gs_a1b2c3d4").
             max_hops: Maximum additional hops beyond maps_to (default 2).
+            content_chars: Truncate each ISA paragraph's content to this many
+                characters. Leave 0 for full content.
 
         Returns:
             Dict with guide_section info, direct_references, connected paragraphs,
@@ -285,6 +300,7 @@ def create_server() -> FastMCP:
         return guide_to_isa_hop(
             guide_section_id,
             max_hops=max_hops,
+            content_chars=content_chars if content_chars > 0 else None,
         )
 
     @mcp.tool()
@@ -566,4 +582,10 @@ def main() -> None:
         format="%(asctime)s [%(name)s] %(levelname)s: %(message)s",
         stream=sys.stderr,
     )
+
+    # Load the reranker model off the request path; startup is not blocked
+    from isa_kb_mcp_server.rerank import warmup
+
+    threading.Thread(target=warmup, name="rerank-warmup", daemon=True).start()
+
     mcp.run(transport="stdio")
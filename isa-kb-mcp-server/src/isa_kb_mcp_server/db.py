@@ -21,10 +21,13 @@ import logging
 import os
 import threading
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import duckdb
 
+if TYPE_CHECKING:
+    import pyarrow as pa
+
 logger = logging.getLogger("isa_kb_mcp_server.db")
 
 # ---------------------------------------------------------------------------
@@ -34,6 +37,11 @@ logger = logging.getLogger("isa_kb_mcp_server.db")
 _lock = threading.Lock()
 _connection: duckdb.DuckDBPyConnection | None = None
 
+# Per-thread cursors on the shared connection. A DuckDB connection object
+# must not execute concurrently from several threads; cursors share the
+# database (and loaded extensions) but carry their own statement state.
+_local = threading.local()
+
 
 def _resolve_db_path() -> Path:
     """Resolve the DuckDB database file path.
@@ -92,6 +100,15 @@ def get_connection() -> duckdb.DuckDBPyConnection:
         return _connection
 
 
+def _thread_cursor() -> duckdb.DuckDBPyConnection:
+    """Return this thread's cursor, re-created if the connection changed."""
+    conn = get_connection()
+    if getattr(_local, "owner", None) is not conn:
+        _local.cursor = conn.cursor()
+        _local.owner = conn
+    return _local.cursor
+
+
 def execute_query(
     sql: str,
     params: list[Any] | None = None,
@@ -100,6 +117,8 @@ def execute_query(
 ) -> list[dict[str, Any]]:
     """Execute a read-only SQL query and return results as dicts.
 
+    Safe to call from multiple threads: each thread runs on its own cursor.
+
     Args:
         sql: The SQL query string. Use ``?`` for parameter placeholders.
         params: Positional parameters for the query.
@@ -113,7 +132,7 @@ def execute_query(
     Raises:
         duckdb.Error: On any DuckDB error (logged before re-raising).
     """
-    conn = get_connection()
+    conn = _thread_cursor()
 
     try:
         if params:
@@ -141,6 +160,31 @@ def execute_query(
         raise
 
 
+def execute_query_arrow(
+    sql: str,
+    params: list[Any] | None = None,
+) -> pa.Table:
+    """Execute a read-only SQL query and return a pyarrow Table.
+
+    Columnar counterpart to ``execute_query`` for bulk consumers: no
+    per-row Python objects are created.
+
+    Raises:
+        duckdb.Error: On any DuckDB error (logged before re-raising).
+    """
+    conn = _thread_cursor()
+
+    try:
+        result = conn.execute(sql, params) if params else conn.execute(sql)
+        arrow = result.arrow()
+        # Newer DuckDB returns a RecordBatchReader, older a Table
+        return arrow.read_all() if hasattr(arrow, "read_all") else arrow
+
+    except duckdb.Error as exc:
+        logger.error("DuckDB query failed: %s | SQL: %s | params: %s", exc, sql[:200], params)
+        raise
+
+
 def close_connection() -> None:
     """Close the DuckDB connection if open.
 
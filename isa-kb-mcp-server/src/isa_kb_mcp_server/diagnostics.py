@@ -19,12 +19,14 @@ def kb_status() -> dict[str, Any]:
     """Return KB health status including table counts and connection state.
 
     Returns:
-        Dict with duckdb, lancedb, and API availability status.
+        Dict with duckdb, lancedb, and API availability status, plus
+        hit/miss counts for the memoized lookup caches.
     """
     status: dict[str, Any] = {
         "duckdb": {"connected": False, "tables": {}},
         "lancedb": {"connected": False, "tables": {}},
         "voyage_ai": {"available": False},
+        "caches": _cache_stats(),
     }
 
     # DuckDB status
@@ -75,6 +77,28 @@ def kb_status() -> dict[str, Any]:
     return status
 
 
+def _cache_stats() -> dict[str, dict[str, Any]]:
+    """Report hit/miss counts for the memoized lookup functions."""
+    from isa_kb_mcp_server import graph, paragraphs, query_expand, search, verify
+
+    cached = {
+        "expand_query": query_expand.expand_query,
+        "resolve_reference": graph._resolve_reference,
+        "list_standards": paragraphs._fetch_standards,
+        "paragraph_reference": paragraphs._lookup_reference,
+        "related": paragraphs._fetch_related,
+    }
+
+    stats: dict[str, dict[str, Any]] = {}
+    for name, fn in cached.items():
+        info = fn.cache_info()
+        stats[name] = {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+    stats["query_embedding"] = search._embedding_cache.stats()
+    stats["search_results"] = search._result_cache.stats()
+    stats["paragraph_resolution"] = verify._resolved_cache.stats()
+    return stats
+
+
 def debug_hop_trace(
     start_id: str,
     *,
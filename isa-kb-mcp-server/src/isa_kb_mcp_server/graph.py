@@ -13,13 +13,27 @@ compatibility on all platforms including Windows ARM64.
 from __future__ import annotations
 
 import logging
-import re
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, Literal
 
-from isa_kb_mcp_server.db import execute_query
+from isa_kb_mcp_server.db import execute_query, execute_query_arrow
+from isa_kb_mcp_server.paragraphs import normalize_reference, parse_isa_ref
 
 logger = logging.getLogger("isa_kb_mcp_server.graph")
 
+# Shared pool for per-seed traversals in guide_to_isa_hop. Worker threads
+# are reused across calls, and with them their DuckDB cursors (see db.py).
+_hop_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="isa-hop")
+
+# Output fields of a maps_to direct reference, in response order
+_DIRECT_REF_FIELDS = (
+    "id", "paragraph_ref", "content", "isa_number", "sub_paragraph",
+    "application_ref", "page_number", "source_doc",
+)
+_get_direct_ref = itemgetter(*_DIRECT_REF_FIELDS)
+
 
 def _resolve_paragraph_id(identifier: str) -> str | None:
     """Resolve a paragraph identifier to an internal ID.
@@ -37,9 +51,17 @@ def _resolve_paragraph_id(identifier: str) -> str | None:
     if identifier.startswith("ip_") or identifier.startswith("gs_"):
         return identifier
 
-    # Strip "ISA " prefix
-    ref = re.sub(r"^ISA\s*", "", identifier, flags=re.IGNORECASE)
+    # Strip "ISA " prefix so equivalent spellings share one cache entry
+    return _resolve_reference(normalize_reference(identifier))
+
 
+@lru_cache(maxsize=4096)
+def _resolve_reference(ref: str) -> str | None:
+    """Look up a canonical paragraph reference (no ``ISA`` prefix).
+
+    Memoized: the DB is opened read-only, so a reference resolves to the
+    same ID for the lifetime of the connection. Cleared by ``clear_caches()``.
+    """
     # Try exact match on paragraph_ref
     rows = execute_query(
         "SELECT id FROM ISAParagraph WHERE paragraph_ref = ? LIMIT 1",
@@ -48,17 +70,18 @@ def _resolve_paragraph_id(identifier: str) -> str | None:
     if rows:
         return rows[0]["id"]
 
-    # Try parsing: {isa_number}.{para_num}({sub_paragraph}).A{app_ref}
-    match = re.match(r"(\d{3})\.(\d+)(?:\(([a-z])\))?(?:\.A(\d+))?", ref)
-    if match:
+    isa_number, para_num, sub_paragraph, application_ref = parse_isa_ref(ref)
+
+    # {isa_number}.{para_num}({sub_paragraph}).A{app_ref}
+    if para_num is not None:
         conditions: list[str] = ["isa_number = ?", "para_num = ?"]
-        params: list[Any] = [match.group(1), match.group(2)]
-        if match.group(3):
+        params: list[Any] = [isa_number, para_num]
+        if sub_paragraph:
             conditions.append("sub_paragraph = ?")
-            params.append(match.group(3))
-        if match.group(4):
+            params.append(sub_paragraph)
+        if application_ref:
             conditions.append("application_ref = ?")
-            params.append(f"A{match.group(4)}")
+            params.append(application_ref)
         where = " AND ".join(conditions)
         rows = execute_query(
             f"SELECT id FROM ISAParagraph WHERE {where} ORDER BY paragraph_ref LIMIT 1",
@@ -67,12 +90,11 @@ def _resolve_paragraph_id(identifier: str) -> str | None:
         if rows:
             return rows[0]["id"]
 
-    # Try application material: {isa_number}.A{ref}
-    app_match = re.match(r"(\d{3})\.A(\d+)", ref)
-    if app_match:
+    # Application material: {isa_number}.A{ref}
+    elif application_ref is not None:
         rows = execute_query(
             "SELECT id FROM ISAParagraph WHERE isa_number = ? AND application_ref = ? LIMIT 1",
-            [app_match.group(1), f"A{app_match.group(2)}"],
+            [isa_number, application_ref],
         )
         if rows:
             return rows[0]["id"]
@@ -80,6 +102,22 @@ def _resolve_paragraph_id(identifier: str) -> str | None:
     return None
 
 
+def _content_projection(content_chars: int | None) -> tuple[str, list[Any]]:
+    """Return the SQL expression (and params) for ``p.content``.
+
+    With ``content_chars`` set, DuckDB truncates the column with ``substr``
+    so only the requested prefix crosses into Python.
+    """
+    if content_chars is None:
+        return "p.content", []
+    return "substr(p.content, 1, ?)", [content_chars]
+
+
+def clear_caches() -> None:
+    """Drop memoized reference lookups (call when the DB is reopened)."""
+    _resolve_reference.cache_clear()
+
+
 def hop_retrieve(
     paragraph_id: str,
     *,
@@ -87,6 +125,8 @@ def hop_retrieve(
     decay: float = 0.7,
     min_score: float = 0.01,
     max_results: int = 30,
+    content_chars: int | None = None,
+    result_format: Literal["dicts", "arrow"] = "dicts",
 ) -> dict[str, Any]:
     """Multi-hop graph traversal from a seed paragraph.
 
@@ -105,6 +145,13 @@ def hop_retrieve(
         min_score: Minimum accumulated score threshold (default 0.01).
             Paths below this are pruned.
         max_results: Maximum number of connected paragraphs to return.
+        content_chars: If set, truncate each paragraph's ``content`` to this
+            many characters inside DuckDB (default None = full content).
+        result_format: ``"dicts"`` (default) or ``"arrow"``. With
+            ``"arrow"`` the connected paragraphs are returned as a pyarrow
+            Table under ``connected_table`` (one column per field) instead
+            of a ``connected`` list, for bulk in-process consumers. Not
+            JSON-serializable.
 
     Returns:
         Dict with keys:
@@ -113,7 +160,15 @@ def hop_retrieve(
           ``hop_score``, ``hop_depth``, and ``hop_path``.
         - ``total_found``: Number of connected paragraphs found.
         - ``max_hops_used``: The configured max hops.
+
+    Raises:
+        ValueError: If ``result_format`` is not ``"dicts"`` or ``"arrow"``.
     """
+    if result_format not in ("dicts", "arrow"):
+        raise ValueError(
+            f"Unknown result_format {result_format!r}; expected 'dicts' or 'arrow'"
+        )
+
     # Resolve human-readable references to internal IDs
     resolved_id = _resolve_paragraph_id(paragraph_id)
     if resolved_id is None:
@@ -141,13 +196,23 @@ def hop_retrieve(
             "error": f"Paragraph '{paragraph_id}' not found",
         }
 
+    content_expr, content_params = _content_projection(content_chars)
+
     # Recursive CTE for multi-hop traversal
+    # - Scalars are bound once in a one-row ``params`` CTE
     # - Starts from all edges where src_id = paragraph_id
     # - Each iteration joins the frontier with hop_edge to discover new nodes
     # - Cycle detection via list_contains(path, dst_id)
-    # - Score pruning via min_score threshold
-    sql = """
-        WITH RECURSIVE hops AS (
+    # - Score pruning via min_score threshold on the (computed once) next_score
+    sql = f"""
+        WITH RECURSIVE params AS (
+            SELECT
+                ?::VARCHAR AS seed_id,
+                ?::DOUBLE AS decay,
+                ?::DOUBLE AS min_score,
+                ?::INTEGER AS max_hops
+        ),
+        hops AS (
             -- Base case: direct neighbors of the seed paragraph
             SELECT
                 e.dst_id,
@@ -155,55 +220,81 @@ def hop_retrieve(
                 list_value(e.src_id) AS path,
                 1 AS depth,
                 e.hop_type
-            FROM hop_edge e
-            WHERE e.src_id = ?
+            FROM hop_edge e, params
+            WHERE e.src_id = params.seed_id
 
             UNION ALL
 
             -- Recursive case: extend paths by one hop
             SELECT
                 e.dst_id,
-                h.score * ? * e.weight AS score,
+                h.score * params.decay * e.weight AS next_score,
                 list_append(h.path, e.src_id) AS path,
                 h.depth + 1 AS depth,
                 e.hop_type
             FROM hops h
-            JOIN hop_edge e ON h.dst_id = e.src_id
-            WHERE h.depth < ?
+            JOIN hop_edge e ON h.dst_id = e.src_id, params
+            WHERE h.depth < params.max_hops
                 AND NOT list_contains(h.path, e.dst_id)
-                AND h.score * ? * e.weight >= ?
+                AND next_score >= params.min_score
+        ),
+        best AS (
+            -- Highest-scoring path per reachable paragraph
+            SELECT DISTINCT ON (p.id)
+                p.id,
+                p.isa_number,
+                p.sub_paragraph,
+                p.application_ref,
+                p.paragraph_ref,
+                {content_expr} AS content,
+                p.page_number,
+                p.source_doc,
+                h.score AS hop_score,
+                h.depth AS hop_depth,
+                h.path AS hop_path,
+                h.hop_type
+            FROM hops h
+            JOIN ISAParagraph p ON h.dst_id = p.id, params
+            WHERE p.id != params.seed_id
+            ORDER BY p.id, h.score DESC
         )
-        SELECT DISTINCT ON (p.id)
-            p.id,
-            p.isa_number,
-            p.para_num,
-            p.sub_paragraph,
-            p.application_ref,
-            p.paragraph_ref,
-            p.content,
-            p.page_number,
-            p.source_doc,
-            h.score AS hop_score,
-            h.depth AS hop_depth,
-            h.path AS hop_path,
-            h.hop_type
-        FROM hops h
-        JOIN ISAParagraph p ON h.dst_id = p.id
-        WHERE p.id != ?
-        ORDER BY p.id, h.score DESC
+        -- Emit each result pre-formatted as a struct (dict in Python)
+        SELECT struct_pack(
+            id := b.id,
+            paragraph_ref := b.paragraph_ref,
+            content := b.content,
+            isa_number := b.isa_number,
+            sub_paragraph := b.sub_paragraph,
+            application_ref := b.application_ref,
+            page_number := b.page_number,
+            source_doc := b.source_doc,
+            hop_score := round(b.hop_score::DOUBLE, 4),
+            hop_depth := b.hop_depth::INTEGER,
+            hop_path := b.hop_path,
+            hop_type := b.hop_type
+        ) AS connected
+        FROM best b
+        ORDER BY b.hop_score DESC, b.id
+        LIMIT ?
     """
 
     params: list[Any] = [
-        resolved_id,    # Base case: src_id = ?
-        decay,          # Recursive: score * ? * weight
-        max_hops,       # Recursive: depth < ?
-        decay,          # Recursive: score * ? * weight >= min
-        min_score,      # Recursive: >= ?
-        resolved_id,    # Exclude seed from results
+        resolved_id,    # params.seed_id
+        decay,          # params.decay
+        min_score,      # params.min_score
+        max_hops,       # params.max_hops
+        *content_params,  # Optional substr length
+        max_results,    # LIMIT ?
     ]
 
+    arrow = result_format == "arrow"
+
     try:
-        rows = execute_query(sql, params)
+        if arrow:
+            # Unpack the struct into columns; no Python rows are built
+            table = execute_query_arrow(f"SELECT unnest(connected) FROM ({sql})", params)
+        else:
+            rows = execute_query(sql, params)
     except Exception as exc:
         logger.error("Hop retrieve failed for %s: %s", resolved_id, exc)
         return {
@@ -214,44 +305,29 @@ def hop_retrieve(
             "error": str(exc),
         }
 
-    # Sort by score descending and limit
-    rows.sort(key=lambda r: -float(r.get("hop_score", 0)))
-    rows = rows[:max_results]
-
-    # Format results
-    connected: list[dict[str, Any]] = []
-    for row in rows:
-        connected.append({
-            "id": row["id"],
-            "paragraph_ref": row.get("paragraph_ref", ""),
-            "content": row.get("content", ""),
-            "isa_number": row.get("isa_number", ""),
-            "sub_paragraph": row.get("sub_paragraph", ""),
-            "application_ref": row.get("application_ref", ""),
-            "page_number": row.get("page_number", 0),
-            "source_doc": row.get("source_doc", ""),
-            "hop_score": round(float(row.get("hop_score", 0)), 4),
-            "hop_depth": int(row.get("hop_depth", 0)),
-            "hop_path": row.get("hop_path", []),
-            "hop_type": row.get("hop_type", ""),
-        })
-
-    logger.info(
-        "Hop retrieve: seed=%s (resolved from %s) hops=%d found=%d",
-        resolved_id, paragraph_id, max_hops, len(connected),
-    )
-
-    return {
+    result: dict[str, Any] = {
         "seed_id": resolved_id,
         "seed_paragraph": {
             "id": seed_rows[0]["id"],
             "paragraph_ref": seed_rows[0].get("paragraph_ref", ""),
             "isa_number": seed_rows[0].get("isa_number", ""),
         },
-        "connected": connected,
-        "total_found": len(connected),
-        "max_hops_used": max_hops,
     }
+    if arrow:
+        result["connected_table"] = table
+        found = table.num_rows
+    else:
+        result["connected"] = [row["connected"] for row in rows]
+        found = len(result["connected"])
+    result["total_found"] = found
+    result["max_hops_used"] = max_hops
+
+    logger.info(
+        "Hop retrieve: seed=%s (resolved from %s) hops=%d found=%d",
+        resolved_id, paragraph_id, max_hops, found,
+    )
+
+    return result
 
 
 def guide_to_isa_hop(
@@ -261,6 +337,7 @@ def guide_to_isa_hop(
     decay: float = 0.7,
     min_score: float = 0.01,
     max_results: int = 30,
+    content_chars: int | None = None,
 ) -> dict[str, Any]:
     """From a guide section, find connected ISA paragraphs.
 
@@ -274,6 +351,8 @@ def guide_to_isa_hop(
         decay: Score decay per hop (default 0.7).
         min_score: Minimum score threshold (default 0.01).
         max_results: Maximum results (default 30).
+        content_chars: If set, truncate ISA paragraph ``content`` to this
+            many characters inside DuckDB (default None = full content).
 
     Returns:
         Dict with seed_id, direct_references (from maps_to),
@@ -281,7 +360,8 @@ def guide_to_isa_hop(
     """
     # Step 1: Get the guide section
     guide_rows = execute_query(
-        "SELECT id, heading, content, source_doc FROM GuideSection WHERE id = ?",
+        "SELECT id, heading, substr(content, 1, 200) AS content_preview, source_doc "
+        "FROM GuideSection WHERE id = ?",
         [guide_section_id],
     )
     if not guide_rows:
@@ -296,16 +376,17 @@ def guide_to_isa_hop(
 
     guide = guide_rows[0]
 
+    content_expr, content_params = _content_projection(content_chars)
+
     # Step 2: Follow maps_to edges to ISA paragraphs
-    maps_to_sql = """
+    maps_to_sql = f"""
         SELECT
             p.id,
+            p.paragraph_ref,
+            {content_expr} AS content,
             p.isa_number,
-            p.para_num,
             p.sub_paragraph,
             p.application_ref,
-            p.paragraph_ref,
-            p.content,
             p.page_number,
             p.source_doc
         FROM maps_to m
@@ -314,50 +395,59 @@ def guide_to_isa_hop(
     """
 
     try:
-        direct_rows = execute_query(maps_to_sql, [guide_section_id])
+        direct_rows = execute_query(maps_to_sql, [*content_params, guide_section_id])
     except Exception as exc:
         logger.error("maps_to query failed for %s: %s", guide_section_id, exc)
         direct_rows = []
 
-    direct_refs: list[dict[str, Any]] = []
-    for row in direct_rows:
-        direct_refs.append({
-            "id": row["id"],
-            "paragraph_ref": row.get("paragraph_ref", ""),
-            "content": row.get("content", ""),
-            "isa_number": row.get("isa_number", ""),
-            "sub_paragraph": row.get("sub_paragraph", ""),
-            "application_ref": row.get("application_ref", ""),
-            "page_number": row.get("page_number", 0),
-            "source_doc": row.get("source_doc", ""),
-            "hop_depth": 0,
-            "hop_path": [guide_section_id],
-        })
-
-    # Step 3: For each direct ISA paragraph, do further hop traversal
-    further_connected: list[dict[str, Any]] = []
-    seen_ids: set[str] = {r["id"] for r in direct_refs}
-
-    if max_hops > 0:
-        for ref in direct_refs:
-            hop_result = hop_retrieve(
-                ref["id"],
+    direct_refs: list[dict[str, Any]] = [
+        dict(
+            zip(_DIRECT_REF_FIELDS, _get_direct_ref(row)),
+            hop_depth=0,
+            hop_path=[guide_section_id],
+        )
+        for row in direct_rows
+    ]
+
+    # Step 3: For each direct ISA paragraph, do further hop traversal.
+    # Keyed by id so dedup and collection happen in one pass; the first
+    # seed to reach a paragraph wins, direct references are never repeated.
+    direct_ids = {r["id"] for r in direct_refs}
+    further: dict[str, dict[str, Any]] = {}
+
+    if max_hops > 0 and direct_refs:
+        def _hop(ref_id: str) -> dict[str, Any]:
+            return hop_retrieve(
+                ref_id,
                 max_hops=max_hops,
                 decay=decay,
                 min_score=min_score,
                 max_results=max_results,
+                content_chars=content_chars,
             )
+
+        ref_ids = [ref["id"] for ref in direct_refs]
+        # Seeds are independent; map() keeps seed order so the merge below
+        # stays deterministic.
+        if len(ref_ids) > 1:
+            hop_results = list(_hop_executor.map(_hop, ref_ids))
+        else:
+            hop_results = [_hop(ref_ids[0])]
+
+        for ref_id, hop_result in zip(ref_ids, hop_results):
             for conn in hop_result.get("connected", []):
-                if conn["id"] not in seen_ids:
-                    seen_ids.add(conn["id"])
-                    # Adjust hop path to include guide section
-                    conn["hop_path"] = [guide_section_id, ref["id"]] + conn.get("hop_path", [])
-                    conn["hop_depth"] = conn.get("hop_depth", 0) + 1
-                    further_connected.append(conn)
+                cid = conn["id"]
+                if cid in direct_ids or cid in further:
+                    continue
+                # Adjust hop path to include guide section
+                conn["hop_path"] = [guide_section_id, ref_id, *conn["hop_path"]]
+                conn["hop_depth"] += 1
+                further[cid] = conn
 
     # Sort further connected by score
-    further_connected.sort(key=lambda r: -float(r.get("hop_score", 0)))
-    further_connected = further_connected[:max_results]
+    further_connected = sorted(
+        further.values(), key=lambda r: -r["hop_score"]
+    )[:max_results]
 
     total = len(direct_refs) + len(further_connected)
     logger.info(
@@ -371,7 +461,7 @@ def guide_to_isa_hop(
             "id": guide["id"],
             "heading": guide.get("heading", ""),
             "source_doc": guide.get("source_doc", ""),
-            "content_preview": (guide.get("content", ""))[:200],
+            "content_preview": guide.get("content_preview", ""),
         },
         "direct_references": direct_refs,
         "connected": further_connected,
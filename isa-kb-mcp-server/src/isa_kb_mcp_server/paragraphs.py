@@ -9,13 +9,76 @@ Implements:
 from __future__ import annotations
 
 import logging
-import re
+from functools import lru_cache
 from typing import Any
 
 from isa_kb_mcp_server.db import execute_query
 
 logger = logging.getLogger("isa_kb_mcp_server.paragraphs")
 
+_NO_REF: tuple[None, None, None, None] = (None, None, None, None)
+
+
+def normalize_reference(reference: str) -> str:
+    """Strip surrounding whitespace and any leading ``ISA`` prefix."""
+    ref = reference.strip()
+    if ref[:3].lower() == "isa":
+        ref = ref[3:].lstrip()
+    return ref
+
+
+def _leading_digits(text: str) -> str:
+    """Return the run of decimal digits at the start of ``text``."""
+    i = 0
+    while i < len(text) and text[i].isdecimal():
+        i += 1
+    return text[:i]
+
+
+def parse_isa_ref(
+    ref: str,
+) -> tuple[str | None, str | None, str | None, str | None]:
+    """Parse a normalized paragraph reference into its components.
+
+    Recognizes ``{isa}.{para}``, ``{isa}.{para}({sub})``,
+    ``{isa}.{para}({sub}).A{n}`` and ``{isa}.A{n}`` at the start of
+    ``ref`` (trailing text is ignored). Hand-rolled string ops; cheaper
+    than regex for these short fixed-format inputs.
+
+    Returns:
+        ``(isa_number, para_num, sub_paragraph, application_ref)`` with
+        ``application_ref`` in stored form (``"A2"``). ``para_num`` is None
+        for application-material-only references; all four are None if
+        ``ref`` is not a paragraph reference.
+    """
+    if len(ref) < 5 or ref[3] != "." or not ref[:3].isdecimal():
+        return _NO_REF
+    isa_number = ref[:3]
+    rest = ref[4:]
+
+    # Application material only: {isa}.A{n}
+    if rest[0] == "A":
+        digits = _leading_digits(rest[1:])
+        return (isa_number, None, None, f"A{digits}") if digits else _NO_REF
+
+    para_num = _leading_digits(rest)
+    if not para_num:
+        return _NO_REF
+    rest = rest[len(para_num):]
+
+    sub_paragraph = None
+    if len(rest) >= 3 and rest[0] == "(" and rest[2] == ")" and "a" <= rest[1] <= "z":
+        sub_paragraph = rest[1]
+        rest = rest[3:]
+
+    application_ref = None
+    if rest.startswith(".A"):
+        digits = _leading_digits(rest[2:])
+        if digits:
+            application_ref = f"A{digits}"
+
+    return (isa_number, para_num, sub_paragraph, application_ref)
+
 
 def list_standards() -> dict[str, Any]:
     """List all ISA standards in the knowledge base.
@@ -26,6 +89,24 @@ def list_standards() -> dict[str, Any]:
           version, effective_date, paragraph_count).
         - ``total_standards``: Count of standards.
     """
+    try:
+        standards = _fetch_standards()
+    except Exception as exc:
+        logger.error("Failed to list standards: %s", exc)
+        return {"standards": [], "total_standards": 0, "error": str(exc)}
+
+    logger.info("Listed %d standards", len(standards))
+
+    return {
+        # Copies: the memoized standard dicts must not be mutated by callers
+        "standards": [dict(standard) for standard in standards],
+        "total_standards": len(standards),
+    }
+
+
+@lru_cache(maxsize=1)
+def _fetch_standards() -> tuple[dict[str, Any], ...]:
+    """Query and format the ISAStandard table (memoized; errors are not cached)."""
     sql = """
         SELECT
             s.id,
@@ -40,29 +121,30 @@ def list_standards() -> dict[str, Any]:
         ORDER BY s.isa_number
     """
 
-    try:
-        rows = execute_query(sql)
-    except Exception as exc:
-        logger.error("Failed to list standards: %s", exc)
-        return {"standards": [], "total_standards": 0, "error": str(exc)}
+    rows = execute_query(sql)
 
-    standards: list[dict[str, Any]] = []
-    for row in rows:
-        standards.append({
+    return tuple(
+        {
             "id": row["id"],
             "isa_number": row["isa_number"],
             "title": row.get("title", ""),
             "version": row.get("version", ""),
             "effective_date": row.get("effective_date", ""),
             "paragraph_count": int(row.get("paragraph_count", 0)),
-        })
+        }
+        for row in rows
+    )
 
-    logger.info("Listed %d standards", len(standards))
 
-    return {
-        "standards": standards,
-        "total_standards": len(standards),
-    }
+def clear_caches() -> None:
+    """Drop memoized standards, reference, and relation lookups.
+
+    The server opens DuckDB read-only, so cached results stay valid until
+    the connection is reopened (e.g. after re-ingestion).
+    """
+    _fetch_standards.cache_clear()
+    _lookup_reference.cache_clear()
+    _fetch_related.cache_clear()
 
 
 def get_paragraph(
@@ -128,13 +210,48 @@ def _get_by_id(paragraph_id: str) -> dict[str, Any]:
 def _get_by_reference(reference: str) -> dict[str, Any]:
     """Lookup a paragraph by its reference string.
 
+    Normalizes the reference (strips whitespace and any ``ISA`` prefix) so
+    equivalent spellings share one cache entry in ``_lookup_reference``.
+    Related paragraphs are attached here, outside that cache, so a failed
+    relation lookup is retried on the next call.
+    """
+    match = _lookup_reference(normalize_reference(reference))
+    if match is not None:
+        # Copies: the memoized match must not be mutated by callers
+        paragraph = dict(match["paragraph"])
+        result: dict[str, Any] = {
+            "paragraph": paragraph,
+            "related": _get_related(paragraph["id"]),
+            "found": True,
+        }
+        if "additional_matches" in match:
+            result["additional_matches"] = [dict(m) for m in match["additional_matches"]]
+        return result
+
+    # Nothing found
+    logger.info("Paragraph not found for reference: %s", reference)
+    return {
+        "paragraph": None,
+        "related": [],
+        "found": False,
+        "error": f"Paragraph '{reference}' not found",
+        "hint": (
+            "Try formats: '315.12', '315.12(a)', '315.12(a).A2', '315.A2', "
+            "or a direct ID like 'ip_a1b2c3d4'."
+        ),
+    }
+
+
+@lru_cache(maxsize=4096)
+def _lookup_reference(ref: str) -> dict[str, Any] | None:
+    """Resolve a canonical reference to its paragraph match, or None.
+
     Parses the reference and builds a query against paragraph_ref or
     the individual columns (isa_number, para_num, sub_paragraph, application_ref).
+    Memoized; returns ``paragraph`` and, when several rows match,
+    ``additional_matches``. The returned dict is shared: callers copy it
+    (see ``_get_by_reference``).
     """
-    # Strip common prefixes
-    ref = reference.strip()
-    ref = re.sub(r"^ISA\s*", "", ref, flags=re.IGNORECASE)
-
     # Try exact match on paragraph_ref first
     rows = execute_query(
         """
@@ -147,23 +264,11 @@ def _get_by_reference(reference: str) -> dict[str, Any]:
     )
 
     if rows:
-        paragraph = _format_paragraph(rows[0])
-        related = _get_related(rows[0]["id"])
-        return {"paragraph": paragraph, "related": related, "found": True}
-
-    # Parse the reference into components
-    # Pattern: {isa_number}.{para_num}({sub_paragraph}).A{app_ref}
-    match = re.match(
-        r"(\d{3})\.(\d+)(?:\(([a-z])\))?(?:\.A(\d+))?",
-        ref,
-    )
+        return {"paragraph": _format_paragraph(rows[0])}
 
-    if match:
-        isa_number = match.group(1)
-        para_num = match.group(2)
-        sub_paragraph = match.group(3)  # may be None
-        application_ref = match.group(4)  # may be None
+    isa_number, para_num, sub_paragraph, application_ref = parse_isa_ref(ref)
 
+    if para_num is not None:
         conditions: list[str] = ["isa_number = ?", "para_num = ?"]
         params: list[Any] = [isa_number, para_num]
 
@@ -173,7 +278,7 @@ def _get_by_reference(reference: str) -> dict[str, Any]:
 
         if application_ref:
             conditions.append("application_ref = ?")
-            params.append(f"A{application_ref}")
+            params.append(application_ref)
 
         where = " AND ".join(conditions)
         rows = execute_query(
@@ -189,26 +294,15 @@ def _get_by_reference(reference: str) -> dict[str, Any]:
 
         if rows:
             # Return first match, but include all matches if multiple
-            paragraph = _format_paragraph(rows[0])
-            related = _get_related(rows[0]["id"])
-
-            result: dict[str, Any] = {
-                "paragraph": paragraph,
-                "related": related,
-                "found": True,
-            }
+            match: dict[str, Any] = {"paragraph": _format_paragraph(rows[0])}
             if len(rows) > 1:
-                result["additional_matches"] = [
+                match["additional_matches"] = [
                     _format_paragraph(r) for r in rows[1:]
                 ]
-            return result
-
-    # Try application material lookup: {isa_number}.A{ref}
-    app_match = re.match(r"(\d{3})\.A(\d+)", ref)
-    if app_match:
-        isa_number = app_match.group(1)
-        app_ref = f"A{app_match.group(2)}"
+            return match
 
+    # Application material lookup: {isa_number}.A{ref}
+    elif application_ref is not None:
         rows = execute_query(
             """
             SELECT id, isa_number, para_num, sub_paragraph, application_ref,
@@ -216,26 +310,13 @@ def _get_by_reference(reference: str) -> dict[str, Any]:
             FROM ISAParagraph
             WHERE isa_number = ? AND application_ref = ?
             """,
-            [isa_number, app_ref],
+            [isa_number, application_ref],
         )
 
         if rows:
-            paragraph = _format_paragraph(rows[0])
-            related = _get_related(rows[0]["id"])
-            return {"paragraph": paragraph, "related": related, "found": True}
+            return {"paragraph": _format_paragraph(rows[0])}
 
-    # Nothing found
-    logger.info("Paragraph not found for reference: %s", reference)
-    return {
-        "paragraph": None,
-        "related": [],
-        "found": False,
-        "error": f"Paragraph '{reference}' not found",
-        "hint": (
-            "Try formats: '315.12', '315.12(a)', '315.12(a).A2', '315.A2', "
-            "or a direct ID like 'ip_a1b2c3d4'."
-        ),
-    }
+    return None
 
 
 def _format_paragraph(row: dict[str, Any]) -> dict[str, Any]:
@@ -256,78 +337,69 @@ def _format_paragraph(row: dict[str, Any]) -> dict[str, Any]:
 def _get_related(paragraph_id: str) -> list[dict[str, Any]]:
     """Get directly related paragraphs via edge tables.
 
-    Looks up outgoing edges (cites, maps_to) and incoming edges
-    (belongs_to) to find related content.
+    All relation types come from one query, so a failure in any of them
+    returns an empty list (no partial results). Failures are logged and
+    not cached, so the next call retries.
     """
-    related: list[dict[str, Any]] = []
-
-    # Outgoing citations
     try:
-        cite_rows = execute_query(
-            """
-            SELECT p.id, p.paragraph_ref, p.isa_number, p.content,
-                   c.citation_text, 'cites' AS relation
-            FROM cites c
-            JOIN ISAParagraph p ON c.dst_id = p.id
-            WHERE c.src_id = ?
-            """,
-            [paragraph_id],
-        )
-        for row in cite_rows:
-            related.append({
-                "id": row["id"],
-                "paragraph_ref": row.get("paragraph_ref", ""),
-                "isa_number": row.get("isa_number", ""),
-                "relation": "cites",
-                "citation_text": row.get("citation_text", ""),
-                "content_preview": (row.get("content", ""))[:200],
-            })
+        related = _fetch_related(paragraph_id)
     except Exception as exc:
-        logger.warning("Failed to get citations for %s: %s", paragraph_id, exc)
+        logger.warning("Failed to get related paragraphs for %s: %s", paragraph_id, exc)
+        return []
+    # Copies: the memoized entries must not be mutated by callers
+    return [dict(r) for r in related]
 
-    # Incoming citations (paragraphs that cite this one)
-    try:
-        cited_by_rows = execute_query(
-            """
-            SELECT p.id, p.paragraph_ref, p.isa_number, p.content,
-                   c.citation_text, 'cited_by' AS relation
-            FROM cites c
-            JOIN ISAParagraph p ON c.src_id = p.id
-            WHERE c.dst_id = ?
-            """,
-            [paragraph_id],
-        )
-        for row in cited_by_rows:
+
+@lru_cache(maxsize=2048)
+def _fetch_related(paragraph_id: str) -> list[dict[str, Any]]:
+    """Query and format the relations of a paragraph (memoized; errors are not cached).
+
+    Looks up outgoing citations, incoming citations, and the parent
+    standard (belongs_to) in a single ``UNION ALL`` query tagged by
+    relation type. The returned list is shared: callers copy it (see
+    ``_get_related``).
+    """
+    sql = """
+        SELECT p.id, p.paragraph_ref, p.isa_number, substr(p.content, 1, 200) AS content_preview,
+               c.citation_text, NULL AS title, 'cites' AS relation, 0 AS rel_order
+        FROM cites c
+        JOIN ISAParagraph p ON c.dst_id = p.id
+        WHERE c.src_id = ?
+        UNION ALL
+        SELECT p.id, p.paragraph_ref, p.isa_number, substr(p.content, 1, 200),
+               c.citation_text, NULL, 'cited_by', 1
+        FROM cites c
+        JOIN ISAParagraph p ON c.src_id = p.id
+        WHERE c.dst_id = ?
+        UNION ALL
+        SELECT s.id, NULL, s.isa_number, NULL,
+               NULL, s.title, 'belongs_to', 2
+        FROM belongs_to b
+        JOIN ISAStandard s ON b.dst_id = s.id
+        WHERE b.src_id = ?
+        ORDER BY rel_order
+    """
+
+    rows = execute_query(sql, [paragraph_id, paragraph_id, paragraph_id])
+
+    related: list[dict[str, Any]] = []
+    for row in rows:
+        relation = row["relation"]
+        if relation == "belongs_to":
             related.append({
                 "id": row["id"],
-                "paragraph_ref": row.get("paragraph_ref", ""),
                 "isa_number": row.get("isa_number", ""),
-                "relation": "cited_by",
-                "citation_text": row.get("citation_text", ""),
-                "content_preview": (row.get("content", ""))[:200],
+                "relation": relation,
+                "title": row.get("title", ""),
             })
-    except Exception as exc:
-        logger.warning("Failed to get cited_by for %s: %s", paragraph_id, exc)
-
-    # Parent standard
-    try:
-        parent_rows = execute_query(
-            """
-            SELECT s.id, s.isa_number, s.title, 'belongs_to' AS relation
-            FROM belongs_to b
-            JOIN ISAStandard s ON b.dst_id = s.id
-            WHERE b.src_id = ?
-            """,
-            [paragraph_id],
-        )
-        for row in parent_rows:
+        else:
             related.append({
                 "id": row["id"],
+                "paragraph_ref": row.get("paragraph_ref", ""),
                 "isa_number": row.get("isa_number", ""),
-                "relation": "belongs_to",
-                "title": row.get("title", ""),
+                "relation": relation,
+                "citation_text": row.get("citation_text", ""),
+                "content_preview": row.get("content_preview", ""),
             })
-    except Exception as exc:
-        logger.warning("Failed to get parent standard for %s: %s", paragraph_id, exc)
 
     return related
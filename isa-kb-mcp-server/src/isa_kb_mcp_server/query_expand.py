@@ -8,6 +8,7 @@ from __future__ import annotations
 
 import logging
 import re
+from functools import lru_cache
 
 logger = logging.getLogger("isa_kb_mcp_server.query_expand")
 
@@ -34,11 +35,38 @@ ISA_ACRONYMS: dict[str, str] = {
 }
 
 
+# Case-folded views of ISA_ACRONYMS, built once at import so expand_query
+# does a single dict probe per hit instead of re-deriving them per call.
+_ACRO_LOOKUP: dict[str, tuple[str, str]] = {
+    k.lower(): (v, v.lower()) for k, v in ISA_ACRONYMS.items()
+}
+
+
+def _compile_acronym_pattern(acronyms: dict[str, str]) -> re.Pattern[str]:
+    """One case-insensitive alternation over all acronyms, longest first.
+
+    Matching whole words only, this finds the same acronyms as tokenizing
+    the query and probing each word, but in a single C-level scan that
+    emits hits rather than every token.
+    """
+    alternatives = sorted(acronyms, key=len, reverse=True)
+    return re.compile(
+        r"\b(?:" + "|".join(map(re.escape, alternatives)) + r")\b",
+        re.IGNORECASE,
+    )
+
+
+_ACRONYM_RE = _compile_acronym_pattern(ISA_ACRONYMS)
+
+
+@lru_cache(maxsize=2048)
 def expand_query(query: str) -> str:
     """Expand ISA acronyms in a query string.
 
-    Tokenizes the query, checks each token against ISA_ACRONYMS,
-    and appends expansions. Original terms are preserved.
+    Scans the query for ISA_ACRONYMS (whole words, case-insensitive) and
+    appends expansions. Original terms are preserved,
+    and each expansion is appended at most once. Memoized, since retries
+    and multi-tier fan-out re-expand the same query.
 
     Args:
         query: The original query string.
@@ -46,18 +74,21 @@ def expand_query(query: str) -> str:
     Returns:
         Query with acronym expansions appended.
     """
-    tokens = re.findall(r'\b[A-Za-z]+\b', query)
+    q_lower = query.lower()
     expansions: list[str] = []
-
-    for token in tokens:
-        if token in ISA_ACRONYMS:
-            expansion = ISA_ACRONYMS[token]
-            if expansion.lower() not in query.lower():
-                expansions.append(expansion)
-        elif token.upper() in ISA_ACRONYMS:
-            expansion = ISA_ACRONYMS[token.upper()]
-            if expansion.lower() not in query.lower():
-                expansions.append(expansion)
+    seen: set[str] = set()
+
+    for match in _ACRONYM_RE.finditer(query):
+        entry = _ACRO_LOOKUP.get(match.group().lower())
+        if entry is None:
+            # Unicode case folding can match non-ASCII look-alikes (e.g. "ſ")
+            continue
+        expansion, expansion_lower = entry
+        if expansion_lower in seen:
+            continue
+        seen.add(expansion_lower)
+        if expansion_lower not in q_lower:
+            expansions.append(expansion)
 
     if expansions:
         expanded = f"{query} {' '.join(expansions)}"
@@ -76,8 +107,25 @@ def expand_with_synonyms(query: str) -> list[str]:
     Returns:
         List of query variants: [original, expanded] (deduplicated).
     """
+    return list(_synonym_variants(query))
+
+
+@lru_cache(maxsize=2048)
+def _synonym_variants(query: str) -> tuple[str, ...]:
+    """Cached, immutable form of expand_with_synonyms."""
     expanded = expand_query(query)
-    variants = [query]
     if expanded != query:
-        variants.append(expanded)
-    return variants
+        return (query, expanded)
+    return (query,)
+
+
+def clear_caches() -> None:
+    """Rebuild the acronym lookup and drop memoized expansions.
+
+    Call after mutating ISA_ACRONYMS at runtime.
+    """
+    global _ACRO_LOOKUP, _ACRONYM_RE
+    _ACRO_LOOKUP = {k.lower(): (v, v.lower()) for k, v in ISA_ACRONYMS.items()}
+    _ACRONYM_RE = _compile_acronym_pattern(ISA_ACRONYMS)
+    expand_query.cache_clear()
+    _synonym_variants.cache_clear()
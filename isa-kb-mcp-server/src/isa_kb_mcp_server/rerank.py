@@ -7,27 +7,87 @@ Falls back gracefully if FlashRank is not installed.
 from __future__ import annotations
 
 import logging
+import threading
 from typing import Any
 
+import numpy as np
+
 logger = logging.getLogger("isa_kb_mcp_server.rerank")
 
 _reranker = None
 _reranker_available = False
+_init_attempted = False
+_init_lock = threading.Lock()
+
+# Passage text handed to FlashRank is capped at ~512 tokens. Attention cost
+# grows quadratically with length and ISA paragraphs are lead-biased, so the
+# tail adds latency without changing the ordering in practice.
+_MAX_PASSAGE_CHARS = 2048
 
 
 def _init_reranker() -> None:
-    """Initialize FlashRank reranker (lazy, first-call)."""
-    global _reranker, _reranker_available
-    if _reranker is not None:
+    """Initialize FlashRank reranker (once; thread-safe).
+
+    Normally triggered by ``warmup()`` at server startup; falls back to
+    lazy init on the first ``rerank_results`` call. A failed init is not
+    retried on every call.
+    """
+    global _reranker, _reranker_available, _init_attempted
+    if _init_attempted:
         return
-    try:
-        from flashrank import Ranker, RerankRequest
-        _reranker = Ranker()
-        _reranker_available = True
-        logger.info("FlashRank reranker initialized")
-    except Exception as exc:
-        logger.warning("FlashRank not available, reranking disabled: %s", exc)
-        _reranker_available = False
+    with _init_lock:
+        if _init_attempted:
+            return
+        try:
+            from flashrank import Ranker
+            _reranker = Ranker()
+            _reranker_available = True
+            logger.info("FlashRank reranker initialized")
+        except Exception as exc:
+            logger.warning("FlashRank not available, reranking disabled: %s", exc)
+            _reranker_available = False
+        finally:
+            _init_attempted = True
+
+
+def warmup() -> None:
+    """Load the FlashRank model and run one tiny rerank ahead of real traffic.
+
+    The dummy rerank primes ONNX Runtime kernels and allocators so the
+    first user query does not pay model-load latency. Intended to run in a
+    background thread from ``main()``.
+    """
+    _init_reranker()
+    if not _reranker_available:
+        return
+
+    rerank_results(
+        "auditor risk assessment procedures",
+        [
+            {"id": "warmup_1", "content": "The auditor shall perform risk assessment procedures."},
+            {"id": "warmup_2", "content": "The auditor shall obtain sufficient appropriate audit evidence."},
+        ],
+        top_k=2,
+    )
+    logger.info("FlashRank reranker warmed up")
+
+
+def _top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, descending, ties in input order.
+
+    Partitions around the k-th largest score and only sorts the survivors,
+    so the result matches a stable full sort without paying for one.
+    """
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        kth = np.partition(scores, n - k)[n - k]
+        candidates = np.flatnonzero(scores >= kth)
+    else:
+        candidates = np.arange(n)
+    order = np.argsort(-scores[candidates], kind="stable")
+    return candidates[order][:k]
 
 
 def rerank_results(
@@ -55,26 +115,28 @@ def rerank_results(
     try:
         from flashrank import RerankRequest
 
-        passages = []
-        for r in results:
-            passages.append({"id": r.get("id", ""), "text": r.get("content", "")})
+        passages = [
+            {"id": r.get("id", ""), "text": (r.get("content") or "")[:_MAX_PASSAGE_CHARS]}
+            for r in results
+        ]
 
         request = RerankRequest(query=query, passages=passages)
         reranked = _reranker.rerank(request)
 
         # Map scores back to original results
-        score_map = {}
-        for item in reranked:
-            score_map[item["id"]] = item["score"]
+        score_map = {item["id"]: item["score"] for item in reranked}
 
         for r in results:
             rid = r.get("id", "")
             if rid in score_map:
                 r["rerank_score"] = round(float(score_map[rid]), 6)
 
-        # Sort by rerank score descending
-        results.sort(key=lambda x: -x.get("rerank_score", 0))
-        return results[:top_k]
+        scores = np.fromiter(
+            (r.get("rerank_score", 0.0) for r in results),
+            dtype=np.float64,
+            count=len(results),
+        )
+        return [results[i] for i in _top_k_indices(scores, top_k)]
 
     except Exception as exc:
         logger.warning("Reranking failed, returning original order: %s", exc)
@@ -17,64 +17,229 @@ Graceful degradation:
 
 from __future__ import annotations
 
+import heapq
+import json
 import logging
+import os
+import threading
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
 from typing import Any
 
+import numpy as np
+
+from isa_kb_mcp_server.cache import TTLCache
 from isa_kb_mcp_server.db import execute_query
-from isa_kb_mcp_server.vectors import get_embedding, is_vector_search_available, search_vectors
+from isa_kb_mcp_server.vectors import (
+    EMBEDDING_MODEL,
+    get_embedding,
+    is_vector_search_available,
+    search_vectors,
+)
 
 logger = logging.getLogger("isa_kb_mcp_server.search")
 
+# Runs the vector leg (Voyage embed round-trip + LanceDB) of hybrid searches
+# while the keyword leg executes on the calling thread.
+_search_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="isa-search")
+
+# Runs the guide tier of multi_tier_search alongside the ISA tier. Kept
+# separate from _search_executor: tier tasks wait on vector-leg tasks, and
+# sharing one pool could deadlock once every worker holds a tier task.
+_tier_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="isa-tier")
+
+
+# Query embeddings, keyed by (model, query). Repeated queries skip the
+# Voyage round-trip entirely.
+_embedding_cache = TTLCache(
+    max_size=int(os.environ.get("ISA_KB_EMBED_CACHE_SIZE", "2000")),
+    ttl=float(os.environ.get("ISA_KB_EMBED_CACHE_TTL", "600")),
+)
+
+
+# Whole hybrid_search responses, keyed by the call arguments. The KB is
+# read-only at runtime, so a response only changes when the DB is
+# re-ingested; the TTL bounds staleness across an out-of-process ingest.
+_result_cache = TTLCache(
+    max_size=int(os.environ.get("ISA_KB_RESULT_CACHE_SIZE", "512")),
+    ttl=float(os.environ.get("ISA_KB_RESULT_CACHE_TTL", "300")),
+)
+
+
+def _copy_response(response: dict[str, Any]) -> dict[str, Any]:
+    """Copy a search response deep enough that callers may mutate results."""
+    return {
+        **response,
+        "results": [dict(r) for r in response["results"]],
+        "warnings": list(response["warnings"]),
+    }
+
+
+def clear_caches() -> None:
+    """Drop cached search responses and query embeddings (e.g. after ingest)."""
+    _result_cache.clear()
+    _embedding_cache.clear()
+
+
+# Embeddings currently being computed, so concurrent misses for the same
+# query (e.g. both tiers of multi_tier_search) share one Voyage call.
+_embed_inflight: dict[Hashable, Future[np.ndarray | None]] = {}
+_embed_inflight_lock = threading.Lock()
+
+
+def _embed_query(query: str) -> np.ndarray | None:
+    """Return the query embedding, served from ``_embedding_cache`` when fresh.
+
+    Concurrent misses for the same query wait on the first caller's
+    request instead of issuing their own.
+    """
+    key = (EMBEDDING_MODEL, query)
+    embedding = _embedding_cache.get(key)
+    if embedding is not None:
+        return embedding
+
+    with _embed_inflight_lock:
+        future = _embed_inflight.get(key)
+        owner = future is None
+        if owner:
+            future = _embed_inflight[key] = Future()
+
+    if not owner:
+        return future.result()
+
+    try:
+        embedding = get_embedding(query)
+        if embedding is not None:
+            _embedding_cache.put(key, embedding)
+        future.set_result(embedding)
+        return embedding
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    finally:
+        with _embed_inflight_lock:
+            del _embed_inflight[key]
+
 
 # ---------------------------------------------------------------------------
 # RRF Fusion
 # ---------------------------------------------------------------------------
 
 
+_RRF_TABLE_SIZE = 4096
+
+# Hybrid legs each fetch more than the final top-k so that items just
+# outside one list can still be rescued by the other during fusion
+_RRF_OVERFETCH = 2
+_RRF_MAX_CANDIDATES = 200
+
+# Retrieval-path bitmask, rendered to its string only for returned results
+_PATH_KEYWORD = 1
+_PATH_VECTOR = 2
+_PATH_NAMES = {
+    _PATH_KEYWORD: "keyword",
+    _PATH_VECTOR: "vector",
+    _PATH_KEYWORD | _PATH_VECTOR: "keyword+vector",
+}
+
+
+def _rrf_candidates(max_results: int) -> int:
+    """Number of candidates each hybrid leg fetches for ``max_results`` hits."""
+    return max(max_results, min(_RRF_OVERFETCH * max_results, _RRF_MAX_CANDIDATES))
+
+
+@lru_cache(maxsize=8)
+def _rrf_weights(k: int) -> tuple[float, ...]:
+    """Reciprocal-rank weights ``1 / (k + rank + 1)`` for ranks 0..4095."""
+    return tuple(1.0 / (k + rank + 1) for rank in range(_RRF_TABLE_SIZE))
+
+
 def _rrf_fuse(
     keyword_results: list[dict[str, Any]],
     vector_results: list[dict[str, Any]],
     *,
     k: int = 60,
+    limit: int | None = None,
+    keyword_format: Callable[[dict[str, Any]], dict[str, Any]] = dict,
+    vector_format: Callable[[dict[str, Any]], dict[str, Any]] = dict,
 ) -> list[dict[str, Any]]:
     """Reciprocal Rank Fusion of keyword and vector result lists.
 
     RRF assigns score ``1 / (k + rank + 1)`` to each result based on its
     position in each list, then sums scores for results appearing in both.
+    An id repeated within one list counts once, at its best (first) rank.
 
     Args:
         keyword_results: Results from DuckDB FTS, ordered by relevance.
         vector_results: Results from LanceDB vector search, ordered by distance.
         k: Smoothing constant (default 60, standard RRF).
+        limit: If set, only the top ``limit`` fused results are selected
+            (heap selection) and returned.
+        keyword_format: Builds the output dict from a keyword row. Default
+            ``dict`` copies pre-formatted rows; pass a row formatter to
+            fuse raw rows so only the selected results are formatted.
+        vector_format: Same, for vector rows.
 
     Returns:
         Fused results sorted by descending RRF score, with ``rrf_score``
         and ``retrieval_path`` added to each dict.
     """
-    scores: dict[str, float] = {}
-    result_map: dict[str, dict[str, Any]] = {}
-    paths: dict[str, list[str]] = {}
+    n = max(len(keyword_results), len(vector_results))
+    if n <= _RRF_TABLE_SIZE:
+        weights = _rrf_weights(k)
+    else:
+        weights = tuple(1.0 / (k + rank + 1) for rank in range(n))
 
-    for rank, r in enumerate(keyword_results):
+    # Only one list has results: with unique ids its order already is the
+    # RRF order, so skip the merge and just score the head of the list.
+    if not keyword_results or not vector_results:
+        if keyword_results:
+            rows, fmt, path = keyword_results, keyword_format, "keyword"
+        else:
+            rows, fmt, path = vector_results, vector_format, "vector"
+        if len({r["id"] for r in rows}) == len(rows):
+            fused: list[dict[str, Any]] = []
+            for w, row in zip(weights, rows[:limit]):
+                entry = fmt(row)
+                entry["rrf_score"] = round(w, 6)
+                entry["retrieval_path"] = path
+                fused.append(entry)
+            return fused
+
+    # One entry per id: [score, row, formatter, path mask]
+    merged: dict[str, list[Any]] = {}
+
+    # Keyword list first: an id already present is a repeat at a worse rank
+    for w, r in zip(weights, keyword_results):
         rid = r["id"]
-        scores[rid] = scores.get(rid, 0.0) + 1.0 / (k + rank + 1)
-        result_map[rid] = r
-        paths.setdefault(rid, []).append("keyword")
+        if rid not in merged:
+            merged[rid] = [w, r, keyword_format, _PATH_KEYWORD]
 
-    for rank, r in enumerate(vector_results):
+    # A row found by both paths keeps the vector row's fields (last wins)
+    for w, r in zip(weights, vector_results):
         rid = r["id"]
-        scores[rid] = scores.get(rid, 0.0) + 1.0 / (k + rank + 1)
-        result_map[rid] = r
-        paths.setdefault(rid, []).append("vector")
-
-    # Sort by descending RRF score
-    sorted_ids = sorted(scores, key=lambda x: -scores[x])
-
-    fused: list[dict[str, Any]] = []
-    for rid in sorted_ids:
-        entry = dict(result_map[rid])
-        entry["rrf_score"] = round(scores[rid], 6)
-        entry["retrieval_path"] = "+".join(paths[rid])
+        entry = merged.get(rid)
+        if entry is None:
+            merged[rid] = [w, r, vector_format, _PATH_VECTOR]
+        elif not entry[3] & _PATH_VECTOR:
+            entry[0] += w
+            entry[1] = r
+            entry[2] = vector_format
+            entry[3] |= _PATH_VECTOR
+
+    # Descending RRF score; ties keep first-seen order in both branches
+    if limit is None:
+        ranked = sorted(merged.values(), key=itemgetter(0), reverse=True)
+    else:
+        ranked = heapq.nlargest(limit, merged.values(), key=itemgetter(0))
+
+    fused = []
+    for score, row, fmt, mask in ranked:
+        entry = fmt(row)
+        entry["rrf_score"] = round(score, 6)
+        entry["retrieval_path"] = _PATH_NAMES[mask]
         fused.append(entry)
 
     return fused
@@ -85,6 +250,44 @@ def _rrf_fuse(
 # ---------------------------------------------------------------------------
 
 
+# DuckDB FTS uses fts_main_ISAParagraph.match_bm25() for scoring. The
+# ``fts`` CTE scores only (id, score) and keeps the top-k, so the wide
+# paragraph columns are joined for k rows instead of carried through the
+# scan and sort. The ISA filter sits inside the scoring subquery so rows
+# outside the requested standard are never scored. Ties break on id.
+# Both variants are built once at import.
+_KEYWORD_SQL_TEMPLATE = """
+    WITH fts AS (
+        SELECT id, score
+        FROM (
+            SELECT id, fts_main_ISAParagraph.match_bm25(id, ?) AS score
+            FROM ISAParagraph
+            {filter_clause}
+        )
+        WHERE score IS NOT NULL
+        ORDER BY score DESC, id
+        LIMIT ?
+    )
+    SELECT
+        p.id,
+        p.isa_number,
+        p.para_num,
+        p.sub_paragraph,
+        p.application_ref,
+        p.paragraph_ref,
+        p.content,
+        p.page_number,
+        p.source_doc,
+        fts.score,
+        round(fts.score, 4) AS confidence
+    FROM fts
+    JOIN ISAParagraph p ON p.id = fts.id
+    ORDER BY fts.score DESC, fts.id
+"""
+_KEYWORD_SQL = _KEYWORD_SQL_TEMPLATE.format(filter_clause="")
+_KEYWORD_SQL_FILTERED = _KEYWORD_SQL_TEMPLATE.format(filter_clause="WHERE isa_number = ?")
+
+
 def _keyword_search(
     query: str,
     *,
@@ -101,35 +304,12 @@ def _keyword_search(
     Returns:
         List of paragraph dicts sorted by FTS relevance score.
     """
-    # DuckDB FTS uses fts_main_ISAParagraph.match_bm25() for scoring
-    filter_clause = ""
-    params: list[Any] = [query, max_results]
-
     if isa_filter:
-        filter_clause = "AND p.isa_number = ?"
-        params = [query, isa_filter, max_results]
-
-    sql = f"""
-        SELECT
-            p.id,
-            p.isa_number,
-            p.para_num,
-            p.sub_paragraph,
-            p.application_ref,
-            p.paragraph_ref,
-            p.content,
-            p.page_number,
-            p.source_doc,
-            p.score
-        FROM (
-            SELECT *, fts_main_ISAParagraph.match_bm25(id, ?) AS score
-            FROM ISAParagraph
-        ) p
-        WHERE p.score IS NOT NULL
-            {filter_clause}
-        ORDER BY p.score DESC
-        LIMIT ?
-    """
+        sql = _KEYWORD_SQL_FILTERED
+        params: list[Any] = [query, isa_filter, max_results]
+    else:
+        sql = _KEYWORD_SQL
+        params = [query, max_results]
 
     try:
         rows = execute_query(sql, params)
@@ -164,7 +344,7 @@ def _vector_search(
     if not is_vector_search_available():
         return [], False
 
-    embedding = get_embedding(query)
+    embedding = _embed_query(query)
     if embedding is None:
         return [], False
 
@@ -177,6 +357,98 @@ def _vector_search(
     return results, True
 
 
+# Top BM25 score at which hybrid search answers from the keyword leg alone
+# and skips the vector leg. Unset (default) always runs both legs; when set,
+# the keyword leg runs before the vector leg instead of alongside it.
+_KEYWORD_SHORTCIRCUIT_THRESHOLD: float | None = (
+    float(os.environ["ISA_KB_KEYWORD_SHORTCIRCUIT_THRESHOLD"])
+    if os.environ.get("ISA_KB_KEYWORD_SHORTCIRCUIT_THRESHOLD")
+    else None
+)
+
+
+def _safe_keyword(
+    query: str, max_results: int, isa_filter: str | None, warnings: list[str],
+) -> list[dict[str, Any]]:
+    """Keyword search that surfaces failures as warnings."""
+    try:
+        return _keyword_search(query, max_results=max_results, isa_filter=isa_filter)
+    except Exception as exc:
+        warnings.append(f"Keyword search failed: {exc}")
+        return []
+
+
+# Each runner returns (results, search_type_used) for one search_type.
+
+
+def _run_keyword(
+    query: str, max_results: int, isa_filter: str | None, warnings: list[str],
+) -> tuple[list[dict[str, Any]], str]:
+    keyword_rows = _safe_keyword(query, max_results, isa_filter, warnings)
+    return _format_keyword_results(keyword_rows), "keyword"
+
+
+def _run_vector(
+    query: str, max_results: int, isa_filter: str | None, warnings: list[str],
+) -> tuple[list[dict[str, Any]], str]:
+    vector_rows, vector_used = _vector_search(query, max_results=max_results, isa_filter=isa_filter)
+    if not vector_used:
+        warnings.append(
+            "Vector search unavailable (VOYAGE_API_KEY not set). "
+            "Falling back to keyword search."
+        )
+        keyword_rows = _safe_keyword(query, max_results, isa_filter, warnings)
+        return _format_keyword_results(keyword_rows), "keyword"
+    return _format_vector_results(vector_rows), "vector"
+
+
+def _run_hybrid(
+    query: str, max_results: int, isa_filter: str | None, warnings: list[str],
+) -> tuple[list[dict[str, Any]], str]:
+    candidates = _rrf_candidates(max_results)
+
+    if _KEYWORD_SHORTCIRCUIT_THRESHOLD is not None:
+        # Keyword leg first so a strong BM25 hit can skip the Voyage round-trip
+        keyword_rows = _safe_keyword(query, candidates, isa_filter, warnings)
+        if keyword_rows and keyword_rows[0]["score"] >= _KEYWORD_SHORTCIRCUIT_THRESHOLD:
+            warnings.append("Vector leg skipped: strong keyword match.")
+            return _format_keyword_results(keyword_rows[:max_results]), "keyword"
+        vector_rows, vector_used = _vector_search(
+            query, max_results=candidates, isa_filter=isa_filter,
+        )
+    else:
+        # Both legs run concurrently, wall time ~ max of the two
+        vector_future = _search_executor.submit(
+            _vector_search, query, max_results=candidates, isa_filter=isa_filter,
+        )
+        keyword_rows = _safe_keyword(query, candidates, isa_filter, warnings)
+        vector_rows, vector_used = vector_future.result()
+
+    if not vector_used:
+        warnings.append(
+            "Vector search unavailable (VOYAGE_API_KEY not set). "
+            "Using keyword-only results."
+        )
+        return _format_keyword_results(keyword_rows[:max_results]), "keyword"
+
+    results = _rrf_fuse(
+        keyword_rows,
+        vector_rows,
+        limit=max_results,
+        keyword_format=_format_keyword_row,
+        vector_format=_format_vector_row,
+    )
+    return results, "hybrid"
+
+
+# Built once at import; unknown search types fall back to hybrid
+_SEARCH_RUNNERS: dict[str, Callable[..., tuple[list[dict[str, Any]], str]]] = {
+    "keyword": _run_keyword,
+    "vector": _run_vector,
+    "hybrid": _run_hybrid,
+}
+
+
 # ---------------------------------------------------------------------------
 # Public API: isa_hybrid_search
 # ---------------------------------------------------------------------------
@@ -209,8 +481,6 @@ def hybrid_search(
         - ``warnings``: List of warning messages (e.g., fallback notices).
     """
     warnings: list[str] = []
-    results: list[dict[str, Any]] = []
-    search_type_used = search_type
 
     # Guard: empty/blank queries cannot be embedded or BM25-searched
     if not query or not query.strip():
@@ -222,111 +492,106 @@ def hybrid_search(
             "warnings": ["Empty query — provide search terms."],
         }
 
-    # Helper: safe keyword search that surfaces failures as warnings
-    def _safe_keyword(q: str, **kw: Any) -> list[dict[str, Any]]:
-        try:
-            return _keyword_search(q, **kw)
-        except Exception as exc:
-            warnings.append(f"Keyword search failed: {exc}")
-            return []
-
-    if search_type == "keyword":
-        # Pure keyword search
-        keyword_rows = _safe_keyword(query, max_results=max_results, isa_filter=isa_filter)
-        results = _format_keyword_results(keyword_rows)
-
-    elif search_type == "vector":
-        # Pure vector search
-        vector_rows, vector_used = _vector_search(query, max_results=max_results, isa_filter=isa_filter)
-        if not vector_used:
-            warnings.append(
-                "Vector search unavailable (VOYAGE_API_KEY not set). "
-                "Falling back to keyword search."
-            )
-            search_type_used = "keyword"
-            keyword_rows = _safe_keyword(query, max_results=max_results, isa_filter=isa_filter)
-            results = _format_keyword_results(keyword_rows)
-        else:
-            results = _format_vector_results(vector_rows)
-
-    else:
-        # Hybrid (default)
-        keyword_rows = _safe_keyword(query, max_results=max_results, isa_filter=isa_filter)
-        vector_rows, vector_used = _vector_search(query, max_results=max_results, isa_filter=isa_filter)
+    cache_key = ("isa", query, isa_filter, search_type, max_results)
+    cached = _result_cache.get(cache_key)
+    if cached is not None:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Search cache hit: query=%r", query[:80])
+        return _copy_response(cached)
 
-        if not vector_used:
-            warnings.append(
-                "Vector search unavailable (VOYAGE_API_KEY not set). "
-                "Using keyword-only results."
-            )
-            search_type_used = "keyword"
-            results = _format_keyword_results(keyword_rows)
-        else:
-            fused = _rrf_fuse(
-                _format_keyword_results(keyword_rows),
-                _format_vector_results(vector_rows),
-            )
-            results = fused[:max_results]
-            search_type_used = "hybrid"
+    run = _SEARCH_RUNNERS.get(search_type, _run_hybrid)
+    results, search_type_used = run(query, max_results, isa_filter, warnings)
 
-    logger.info(
-        "Search completed: type=%s query=%r results=%d",
-        search_type_used, query[:80], len(results),
-    )
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "Search completed: type=%s query=%r results=%d",
+            search_type_used, query[:80], len(results),
+        )
 
-    return {
+    response = {
         "results": results,
         "total_results": len(results),
         "search_type_used": search_type_used,
         "warnings": warnings,
     }
 
+    # Degraded responses (fallbacks, failed legs) are not pinned in the cache
+    if not warnings:
+        _result_cache.put(cache_key, _copy_response(response))
+
+    return response
+
 
 # ---------------------------------------------------------------------------
 # Result formatting helpers
 # ---------------------------------------------------------------------------
 
 
+def _keyword_confidence(row: dict[str, Any]) -> float:
+    """BM25 confidence, pre-rounded by the FTS query when available."""
+    confidence = row.get("confidence")
+    if confidence is None:
+        confidence = round(float(row.get("score", 0)), 4)
+    return confidence
+
+
+def _format_keyword_row(row: dict[str, Any]) -> dict[str, Any]:
+    """Normalize one keyword search row to the standard result format."""
+    return {
+        "id": row["id"],
+        "paragraph_ref": row.get("paragraph_ref", ""),
+        "content": row.get("content", ""),
+        "isa_number": row.get("isa_number", ""),
+        "sub_paragraph": row.get("sub_paragraph", ""),
+        "application_ref": row.get("application_ref", ""),
+        "page_number": row.get("page_number", 0),
+        "source_doc": row.get("source_doc", ""),
+        "confidence": _keyword_confidence(row),
+        "retrieval_path": "keyword",
+    }
+
+
+def _vector_confidences(rows: list[dict[str, Any]]) -> list[float]:
+    """Convert LanceDB distances to confidences in one NumPy pass.
+
+    LanceDB returns ``_distance`` (lower = more similar); confidence is
+    ``1 / (1 + distance)`` (higher = better), rounded to 4 places.
+    """
+    distances = np.fromiter(
+        (row.get("_distance", 1.0) for row in rows), dtype=np.float64, count=len(rows),
+    )
+    return np.round(1.0 / (1.0 + distances), 4).tolist()
+
+
+def _format_vector_row(
+    row: dict[str, Any], confidence: float | None = None,
+) -> dict[str, Any]:
+    """Normalize one vector search row to the standard result format."""
+    if confidence is None:
+        # Same transform as _vector_confidences, for a single row
+        confidence = round(1.0 / (1.0 + row.get("_distance", 1.0)), 4)
+
+    return {
+        "id": row["id"],
+        "paragraph_ref": row.get("paragraph_ref", ""),
+        "content": row.get("content", ""),
+        "isa_number": row.get("isa_number", ""),
+        "sub_paragraph": row.get("sub_paragraph", ""),
+        "application_ref": row.get("application_ref", ""),
+        "page_number": row.get("page_number", 0),
+        "confidence": confidence,
+        "retrieval_path": "vector",
+    }
+
+
 def _format_keyword_results(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
     """Normalize keyword search results to a standard format."""
-    formatted: list[dict[str, Any]] = []
-    for row in rows:
-        formatted.append({
-            "id": row["id"],
-            "paragraph_ref": row.get("paragraph_ref", ""),
-            "content": row.get("content", ""),
-            "isa_number": row.get("isa_number", ""),
-            "sub_paragraph": row.get("sub_paragraph", ""),
-            "application_ref": row.get("application_ref", ""),
-            "page_number": row.get("page_number", 0),
-            "source_doc": row.get("source_doc", ""),
-            "confidence": round(float(row.get("score", 0)), 4),
-            "retrieval_path": "keyword",
-        })
-    return formatted
+    return [_format_keyword_row(row) for row in rows]
 
 
 def _format_vector_results(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
     """Normalize vector search results to a standard format."""
-    formatted: list[dict[str, Any]] = []
-    for row in rows:
-        # LanceDB returns _distance (lower = more similar)
-        # Convert to confidence (higher = better): 1 / (1 + distance)
-        distance = float(row.get("_distance", 1.0))
-        confidence = round(1.0 / (1.0 + distance), 4)
-
-        formatted.append({
-            "id": row["id"],
-            "paragraph_ref": row.get("paragraph_ref", ""),
-            "content": row.get("content", ""),
-            "isa_number": row.get("isa_number", ""),
-            "sub_paragraph": row.get("sub_paragraph", ""),
-            "application_ref": row.get("application_ref", ""),
-            "page_number": row.get("page_number", 0),
-            "confidence": confidence,
-            "retrieval_path": "vector",
-        })
-    return formatted
+    return list(map(_format_vector_row, rows, _vector_confidences(rows)))
 
 
 # ---------------------------------------------------------------------------
@@ -334,6 +599,36 @@ def _format_vector_results(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
 # ---------------------------------------------------------------------------
 
 
+# Same shape as _KEYWORD_SQL_TEMPLATE, over GuideSection
+_GUIDE_KEYWORD_SQL_TEMPLATE = """
+    WITH fts AS (
+        SELECT id, score
+        FROM (
+            SELECT id, fts_main_GuideSection.match_bm25(id, ?) AS score
+            FROM GuideSection
+            {filter_clause}
+        )
+        WHERE score IS NOT NULL
+        ORDER BY score DESC, id
+        LIMIT ?
+    )
+    SELECT
+        g.id,
+        g.heading,
+        g.content,
+        g.source_doc,
+        fts.score,
+        round(fts.score, 4) AS confidence
+    FROM fts
+    JOIN GuideSection g ON g.id = fts.id
+    ORDER BY fts.score DESC, fts.id
+"""
+_GUIDE_KEYWORD_SQL = _GUIDE_KEYWORD_SQL_TEMPLATE.format(filter_clause="")
+_GUIDE_KEYWORD_SQL_FILTERED = _GUIDE_KEYWORD_SQL_TEMPLATE.format(
+    filter_clause="WHERE source_doc = ?",
+)
+
+
 def _guide_keyword_search(
     query: str,
     *,
@@ -350,29 +645,12 @@ def _guide_keyword_search(
     Returns:
         List of guide section dicts sorted by FTS relevance score.
     """
-    filter_clause = ""
-    params: list[Any] = [query, max_results]
-
     if guide_filter:
-        filter_clause = "AND g.source_doc = ?"
-        params = [query, guide_filter, max_results]
-
-    sql = f"""
-        SELECT
-            g.id,
-            g.heading,
-            g.content,
-            g.source_doc,
-            g.score
-        FROM (
-            SELECT *, fts_main_GuideSection.match_bm25(id, ?) AS score
-            FROM GuideSection
-        ) g
-        WHERE g.score IS NOT NULL
-            {filter_clause}
-        ORDER BY g.score DESC
-        LIMIT ?
-    """
+        sql = _GUIDE_KEYWORD_SQL_FILTERED
+        params: list[Any] = [query, guide_filter, max_results]
+    else:
+        sql = _GUIDE_KEYWORD_SQL
+        params = [query, max_results]
 
     try:
         rows = execute_query(sql, params)
@@ -401,7 +679,7 @@ def _guide_vector_search(
     if not is_vector_search_available():
         return [], False
 
-    embedding = get_embedding(query)
+    embedding = _embed_query(query)
     if embedding is None:
         return [], False
 
@@ -409,61 +687,65 @@ def _guide_vector_search(
         embedding,
         table_name="guides",
         limit=max_results,
-        isa_filter=None,  # No isa_filter for guides
+        guide_filter=guide_filter,
     )
 
-    # Apply guide_filter post-search if specified
-    if guide_filter and results:
-        results = [r for r in results if r.get("source_doc") == guide_filter]
-
     return results, True
 
 
+def _format_guide_keyword_row(row: dict[str, Any]) -> dict[str, Any]:
+    """Normalize one guide keyword search row."""
+    return {
+        "id": row["id"],
+        "heading": row.get("heading", ""),
+        "content": row.get("content", ""),
+        "source_doc": row.get("source_doc", ""),
+        "confidence": _keyword_confidence(row),
+        "retrieval_path": "keyword",
+        "tier": 1,
+    }
+
+
+def _format_guide_vector_row(
+    row: dict[str, Any], confidence: float | None = None,
+) -> dict[str, Any]:
+    """Normalize one guide vector search row."""
+    if confidence is None:
+        confidence = round(1.0 / (1.0 + row.get("_distance", 1.0)), 4)
+
+    # Ingestion stores isa_references as list<string>; tables written by
+    # older ingests hold a JSON string instead
+    isa_refs_raw = row.get("isa_references", "[]")
+    if isinstance(isa_refs_raw, list):
+        isa_refs = isa_refs_raw
+    elif isinstance(isa_refs_raw, str):
+        try:
+            isa_refs = json.loads(isa_refs_raw)
+        except (json.JSONDecodeError, TypeError):
+            isa_refs = []
+    else:
+        isa_refs = isa_refs_raw or []
+
+    return {
+        "id": row["id"],
+        "heading": row.get("heading", ""),
+        "content": row.get("content", ""),
+        "source_doc": row.get("source_doc", ""),
+        "isa_references": isa_refs,
+        "confidence": confidence,
+        "retrieval_path": "vector",
+        "tier": 1,
+    }
+
+
 def _format_guide_keyword_results(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
     """Normalize guide keyword search results."""
-    formatted: list[dict[str, Any]] = []
-    for row in rows:
-        formatted.append({
-            "id": row["id"],
-            "heading": row.get("heading", ""),
-            "content": row.get("content", ""),
-            "source_doc": row.get("source_doc", ""),
-            "confidence": round(float(row.get("score", 0)), 4),
-            "retrieval_path": "keyword",
-            "tier": 1,
-        })
-    return formatted
+    return [_format_guide_keyword_row(row) for row in rows]
 
 
 def _format_guide_vector_results(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
     """Normalize guide vector search results."""
-    formatted: list[dict[str, Any]] = []
-    for row in rows:
-        distance = float(row.get("_distance", 1.0))
-        confidence = round(1.0 / (1.0 + distance), 4)
-
-        # Parse isa_references from JSON string if present
-        isa_refs_raw = row.get("isa_references", "[]")
-        if isinstance(isa_refs_raw, str):
-            try:
-                import json
-                isa_refs = json.loads(isa_refs_raw)
-            except (json.JSONDecodeError, TypeError):
-                isa_refs = []
-        else:
-            isa_refs = isa_refs_raw or []
-
-        formatted.append({
-            "id": row["id"],
-            "heading": row.get("heading", ""),
-            "content": row.get("content", ""),
-            "source_doc": row.get("source_doc", ""),
-            "isa_references": isa_refs,
-            "confidence": confidence,
-            "retrieval_path": "vector",
-            "tier": 1,
-        })
-    return formatted
+    return list(map(_format_guide_vector_row, rows, _vector_confidences(rows)))
 
 
 # ---------------------------------------------------------------------------
@@ -528,30 +810,37 @@ def guide_search(
             results = _format_guide_vector_results(vector_rows)
 
     else:
-        # Hybrid (default)
-        keyword_rows = _safe_guide_keyword(query, max_results=max_results, guide_filter=guide_filter)
-        vector_rows, vector_used = _guide_vector_search(query, max_results=max_results, guide_filter=guide_filter)
+        # Hybrid (default): vector leg runs concurrently with the keyword leg
+        candidates = _rrf_candidates(max_results)
+        vector_future = _search_executor.submit(
+            _guide_vector_search, query, max_results=candidates, guide_filter=guide_filter,
+        )
+        keyword_rows = _safe_guide_keyword(query, max_results=candidates, guide_filter=guide_filter)
+        vector_rows, vector_used = vector_future.result()
 
         if not vector_used:
             warnings.append("Vector search unavailable. Using keyword-only results.")
             search_type_used = "keyword"
-            results = _format_guide_keyword_results(keyword_rows)
+            results = _format_guide_keyword_results(keyword_rows[:max_results])
         else:
-            fused = _rrf_fuse(
-                _format_guide_keyword_results(keyword_rows),
-                _format_guide_vector_results(vector_rows),
+            results = _rrf_fuse(
+                keyword_rows,
+                vector_rows,
+                limit=max_results,
+                keyword_format=_format_guide_keyword_row,
+                vector_format=_format_guide_vector_row,
             )
-            results = fused[:max_results]
             search_type_used = "hybrid"
 
     # Ensure all results have tier=1
     for r in results:
         r["tier"] = 1
 
-    logger.info(
-        "Guide search completed: type=%s query=%r results=%d",
-        search_type_used, query[:80], len(results),
-    )
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "Guide search completed: type=%s query=%r results=%d",
+            search_type_used, query[:80], len(results),
+        )
 
     return {
         "results": results,
@@ -640,20 +929,18 @@ def multi_tier_search(
     warnings: list[str] = []
     all_results: list[dict[str, Any]] = []
 
-    # Tier 1: Guide sections
+    # Tier 1 (guide sections) runs in the background while tier 2 runs here
+    guide_future = None
     if 1 in tiers:
-        guide_resp = guide_search(
+        guide_future = _tier_executor.submit(
+            guide_search,
             query,
             max_results=max_results,
             guide_filter=guide_filter,
             search_type=search_type,
         )
-        for r in guide_resp["results"]:
-            r["tier"] = 1
-        all_results.extend(guide_resp["results"])
-        warnings.extend(guide_resp.get("warnings", []))
 
-    # Tier 2: ISA paragraphs
+    isa_resp = None
     if 2 in tiers:
         isa_resp = hybrid_search(
             query,
@@ -661,6 +948,17 @@ def multi_tier_search(
             isa_filter=isa_filter,
             search_type=search_type,
         )
+
+    # Tier 1: Guide sections
+    if guide_future is not None:
+        guide_resp = guide_future.result()
+        for r in guide_resp["results"]:
+            r["tier"] = 1
+        all_results.extend(guide_resp["results"])
+        warnings.extend(guide_resp.get("warnings", []))
+
+    # Tier 2: ISA paragraphs
+    if isa_resp is not None:
         for r in isa_resp["results"]:
             r["tier"] = 2
         all_results.extend(isa_resp["results"])
@@ -673,16 +971,16 @@ def multi_tier_search(
         base_score = r.get("confidence", r.get("rrf_score", 0))
         r["weighted_score"] = round(float(base_score) * TIER_WEIGHTS.get(tier, 1.0), 6)
 
-    # Sort by weighted score descending
-    all_results.sort(key=lambda x: -x.get("weighted_score", 0))
-
     # Authority-based dedup: if guide references same ISA paragraph in direct results,
-    # keep the ISA paragraph and annotate with guide context
+    # keep the ISA paragraph and annotate with guide context. It filters
+    # without reordering, so it can run before the top-k selection.
     if 1 in tiers and 2 in tiers:
         all_results = _authority_dedup(all_results)
 
-    # Limit to max_results
-    all_results = all_results[:max_results]
+    # Top max_results by weighted score (heap selection; ties keep tier order)
+    all_results = heapq.nlargest(
+        max_results, all_results, key=lambda x: x.get("weighted_score", 0),
+    )
 
     # Count by tier
     tier_counts = {}
@@ -690,11 +988,12 @@ def multi_tier_search(
         t = r.get("tier", 0)
         tier_counts[t] = tier_counts.get(t, 0) + 1
 
-    logger.info(
-        "Multi-tier search: query=%r tiers=%s results=%d (tier1=%d, tier2=%d)",
-        query[:80], tiers, len(all_results),
-        tier_counts.get(1, 0), tier_counts.get(2, 0),
-    )
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "Multi-tier search: query=%r tiers=%s results=%d (tier1=%d, tier2=%d)",
+            query[:80], tiers, len(all_results),
+            tier_counts.get(1, 0), tier_counts.get(2, 0),
+        )
 
     return {
         "results": all_results,
@@ -2,7 +2,8 @@
 
 Provides:
 - LanceDB table access for similarity search on pre-embedded ISA paragraphs.
-- Voyage AI runtime embedding for query text (``input_type="query"``).
+- Voyage AI runtime embedding for query text (``input_type="query"``),
+  with concurrent requests micro-batched into single API calls.
 - Graceful fallback: if VOYAGE_API_KEY is not set, vector search is
   unavailable and hybrid search degrades to keyword-only mode.
 
@@ -14,9 +15,15 @@ from __future__ import annotations
 
 import logging
 import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
 logger = logging.getLogger("isa_kb_mcp_server.vectors")
 
 # ---------------------------------------------------------------------------
@@ -27,6 +34,12 @@ _lancedb_db: Any = None
 _voyage_client: Any = None
 _voyage_available: bool = False
 
+# Opened LanceDB table handles by name; open_table re-reads the manifest
+_tables: dict[str, Any] = {}
+
+# Voyage model used for runtime query embeddings (must match ingestion)
+EMBEDDING_MODEL = "voyage-law-2"
+
 
 def _resolve_lancedb_path() -> Path:
     """Resolve the LanceDB data directory path."""
@@ -74,7 +87,7 @@ def init_vectors() -> None:
 
                 _voyage_client = voyageai.Client(api_key=api_key)
                 _voyage_available = True
-                logger.info("Voyage AI client initialized (voyage-law-2)")
+                logger.info("Voyage AI client initialized (%s)", EMBEDDING_MODEL)
             except Exception as exc:
                 logger.warning("Failed to initialize Voyage AI client: %s", exc)
                 _voyage_available = False
@@ -91,17 +104,23 @@ def is_vector_search_available() -> bool:
     return _lancedb_db is not None and _voyage_available
 
 
-def get_embedding(text: str) -> list[float] | None:
+def get_embedding(text: str) -> np.ndarray | None:
     """Compute a query embedding using Voyage AI voyage-law-2.
 
+    Concurrent calls are coalesced into one batched API request (see
+    ``_EmbeddingBatcher``; ``ISA_KB_EMBED_BATCH_WINDOW_MS=0`` disables).
+    A call with no other request pending is sent straight away.
+
     Args:
         text: The query text to embed.
 
     Returns:
-        A 1024-dimensional embedding vector, or None if Voyage AI
+        A 1024-dimensional float32 embedding vector, or None if Voyage AI
         is not available or the text is empty/blank.
 
     Raises:
+        TimeoutError: If a batched request gets no result within
+            ``ISA_KB_EMBED_TIMEOUT_SECONDS`` (default 60).
         Exception: On Voyage AI API errors (rate limits, auth, etc.).
     """
     if not _voyage_available or _voyage_client is None:
@@ -112,67 +131,251 @@ def get_embedding(text: str) -> list[float] | None:
         logger.warning("Empty/blank text passed to get_embedding, returning None")
         return None
 
+    if _batcher.window > 0:
+        return _batcher.embed(text)
+    return _embed_texts([text])[0]
+
+
+def _embed_texts(texts: list[str]) -> list[np.ndarray]:
+    """Embed several query texts in one Voyage AI request.
+
+    Vectors come back as float32 arrays: a quarter of the memory of a list
+    of Python floats in the embedding cache, and the layout LanceDB
+    searches with.
+    """
     result = _voyage_client.embed(
-        texts=[text],
-        model="voyage-law-2",
+        texts=texts,
+        model=EMBEDDING_MODEL,
         input_type="query",
     )
-    return result.embeddings[0]
+    return [np.asarray(e, dtype=np.float32) for e in result.embeddings]
+
+
+class _EmbeddingBatcher:
+    """Coalesce concurrent query embeddings into batched Voyage AI calls.
+
+    Requests are queued and served by up to ``workers`` daemon threads, so
+    independent calls still run in parallel. A worker takes the first
+    request plus everything already queued. A lone request is sent at
+    once; when others are pending, the worker keeps collecting for up to
+    ``window`` seconds or ``max_batch`` items. The distinct texts are
+    embedded in one API call and every caller's future is resolved.
+    Errors are propagated to all callers in the batch.
+
+    Callers wait at most ``timeout`` seconds for their result and then
+    get a ``TimeoutError``, so a hung API call cannot block a tool forever.
+    """
+
+    def __init__(
+        self,
+        window: float,
+        max_batch: int,
+        *,
+        workers: int = 4,
+        timeout: float = 60.0,
+    ) -> None:
+        self.window = window
+        self.max_batch = max_batch
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self._queue: queue.Queue[tuple[str, Future[np.ndarray]]] = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def embed(self, text: str) -> np.ndarray:
+        """Queue ``text`` and block until its batch has been embedded."""
+        future: Future[np.ndarray] = Future()
+        self._queue.put((text, future))
+        self._ensure_workers()
+        return future.result(timeout=self.timeout)
+
+    def _ensure_workers(self) -> None:
+        if len(self._threads) >= self.workers:
+            return
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._run,
+                    name=f"voyage-embed-batcher-{len(self._threads)}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _collect(self) -> list[tuple[str, Future[np.ndarray]]]:
+        """Block for one request, then gather the batch to send with it."""
+        batch = [self._queue.get()]
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if len(batch) == 1:
+            return batch
+
+        # Other callers are active: give stragglers the window to join
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            texts = list(dict.fromkeys(text for text, _ in batch))
+            try:
+                embeddings = dict(zip(texts, _embed_texts(texts)))
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+
+            if len(batch) > 1:
+                logger.debug("Embedded %d queries (%d distinct) in one call", len(batch), len(texts))
+            for text, future in batch:
+                future.set_result(embeddings[text])
+
+
+_batcher = _EmbeddingBatcher(
+    window=float(os.environ.get("ISA_KB_EMBED_BATCH_WINDOW_MS", "10")) / 1000.0,
+    max_batch=int(os.environ.get("ISA_KB_EMBED_BATCH_SIZE", "32")),
+    workers=int(os.environ.get("ISA_KB_EMBED_BATCH_WORKERS", "4")),
+    timeout=float(os.environ.get("ISA_KB_EMBED_TIMEOUT_SECONDS", "60")),
+)
+
+
+# Candidate multiplier for exact re-ranking of PQ-compressed ANN hits
+_REFINE_FACTOR = 10
+
+# Result columns and the default used when a column is absent or null.
+# The Arrow schema already fixes each column's Python type.
+_RESULT_COLUMNS: tuple[tuple[str, Any], ...] = (
+    ("id", ""),
+    ("content", ""),
+    ("isa_number", ""),
+    ("paragraph_ref", ""),
+    ("sub_paragraph", ""),
+    ("application_ref", ""),
+    ("page_number", 0),
+    ("_distance", 0.0),
+)
+
+# The guides table carries guide metadata instead of ISA paragraph fields
+_GUIDE_RESULT_COLUMNS: tuple[tuple[str, Any], ...] = (
+    ("id", ""),
+    ("content", ""),
+    ("heading", ""),
+    ("source_doc", ""),
+    ("isa_references", "[]"),
+    ("page_start", 0),
+    ("page_end", 0),
+    ("_distance", 0.0),
+)
+
+_TABLE_COLUMNS: dict[str, tuple[tuple[str, Any], ...]] = {
+    "guides": _GUIDE_RESULT_COLUMNS,
+}
+
+
+def _sql_literal(value: str) -> str:
+    """Quote ``value`` as a SQL string literal for a LanceDB filter."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _eq_filter(column: str, value: str) -> Any:
+    """Build a ``column = value`` LanceDB filter.
+
+    Uses a typed expression (value bound as a literal, nothing to parse or
+    escape) where LanceDB provides ``lancedb.expr``; older releases only
+    accept SQL strings.
+    """
+    try:
+        from lancedb.expr import col, lit
+    except ImportError:
+        return f"{column} = {_sql_literal(value)}"
+    return col(column) == lit(value)
+
+
+def _rows_from_arrow(
+    table: Any, columns: tuple[tuple[str, Any], ...],
+) -> list[dict[str, Any]]:
+    """Convert a LanceDB Arrow result to row dicts, column by column."""
+    n = table.num_rows
+    names = [name for name, _ in columns]
+    values: list[list[Any]] = []
+    for name, default in columns:
+        if name not in table.column_names:
+            values.append([default] * n)
+            continue
+        column = table.column(name)
+        if column.null_count:
+            values.append([default if v is None else v for v in column.to_pylist()])
+        else:
+            values.append(column.to_pylist())
+    return [dict(zip(names, row)) for row in zip(*values)]
 
 
 def search_vectors(
-    query_embedding: list[float],
+    query_embedding: np.ndarray | list[float],
     *,
     table_name: str = "isa_chunks",
     limit: int = 20,
     isa_filter: str | None = None,
+    guide_filter: str | None = None,
 ) -> list[dict[str, Any]]:
     """Search LanceDB for similar vectors.
 
+    Filters are applied inside LanceDB before the similarity search, so a
+    filtered query still returns up to ``limit`` matching rows.
+
     Args:
         query_embedding: The query embedding vector (1024 dims).
         table_name: LanceDB table to search (default: ``isa_chunks``).
         limit: Maximum number of results.
         isa_filter: Optional ISA number filter (e.g., ``"315"``).
+        guide_filter: Optional guide ``source_doc`` filter (e.g., ``"ISA_LCE"``).
 
     Returns:
         List of result dicts with keys: ``id``, ``content``, ``isa_number``,
         ``paragraph_ref``, ``sub_paragraph``, ``application_ref``,
-        ``page_number``, ``_distance``.
+        ``page_number``, ``_distance``. For the ``guides`` table the keys
+        are ``id``, ``content``, ``heading``, ``source_doc``,
+        ``isa_references``, ``page_start``, ``page_end``, ``_distance``.
         Empty list if LanceDB is not available or table doesn't exist.
     """
     if _lancedb_db is None:
         logger.warning("LanceDB not available, returning empty results")
         return []
 
-    try:
-        table = _lancedb_db.open_table(table_name)
-    except Exception as exc:
-        logger.warning("LanceDB table '%s' not found: %s", table_name, exc)
-        return []
+    table = _tables.get(table_name)
+    if table is None:
+        try:
+            table = _lancedb_db.open_table(table_name)
+        except Exception as exc:
+            logger.warning("LanceDB table '%s' not found: %s", table_name, exc)
+            return []
+        _tables[table_name] = table
 
     try:
-        query = table.search(query_embedding).limit(limit)
+        # With an IVF_PQ index, re-score the top limit * _REFINE_FACTOR PQ
+        # candidates on full-precision vectors so distances stay exact
+        # (no effect on unindexed tables, which are scanned exactly)
+        query = table.search(query_embedding).limit(limit).refine_factor(_REFINE_FACTOR)
 
         if isa_filter:
-            query = query.where(f"isa_number = '{isa_filter}'")
-
-        results = query.to_pandas()
-
-        rows: list[dict[str, Any]] = []
-        for _, row in results.iterrows():
-            rows.append({
-                "id": str(row.get("id", "")),
-                "content": str(row.get("content", "")),
-                "isa_number": str(row.get("isa_number", "")),
-                "paragraph_ref": str(row.get("paragraph_ref", "")),
-                "sub_paragraph": str(row.get("sub_paragraph", "")),
-                "application_ref": str(row.get("application_ref", "")),
-                "page_number": int(row.get("page_number", 0)),
-                "_distance": float(row.get("_distance", 0.0)),
-            })
+            query = query.where(_eq_filter("isa_number", isa_filter), prefilter=True)
+        if guide_filter:
+            query = query.where(_eq_filter("source_doc", guide_filter), prefilter=True)
 
-        return rows
+        # Arrow columns straight to Python lists: no DataFrame, no per-row Series
+        columns = _TABLE_COLUMNS.get(table_name, _RESULT_COLUMNS)
+        return _rows_from_arrow(query.to_arrow(), columns)
 
     except Exception as exc:
         logger.error("LanceDB search failed: %s", exc)
@@ -183,6 +386,7 @@ def close_vectors() -> None:
     """Clean up vector resources on shutdown."""
     global _lancedb_db, _voyage_client, _voyage_available
 
+    _tables.clear()
     _lancedb_db = None
     _voyage_client = None
     _voyage_available = False
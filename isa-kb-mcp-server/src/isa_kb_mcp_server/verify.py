@@ -16,13 +16,51 @@ Each tool returns: ``{ score: float, passed: bool, details: [...] }``
 from __future__ import annotations
 
 import logging
+import os
 import re
+from itertools import islice
 from typing import Any
 
+from isa_kb_mcp_server.cache import TTLCache
 from isa_kb_mcp_server.db import execute_query
 
 logger = logging.getLogger("isa_kb_mcp_server.verify")
 
+# Resolved paragraph identifiers (ID or reference -> id/isa_number row),
+# shared across calls. Unknown identifiers are stored as {} so that a
+# cached miss can be told apart from a cache miss (None).
+_resolved_cache = TTLCache(
+    max_size=int(os.environ.get("ISA_KB_RESOLVE_CACHE_SIZE", "4096")),
+    ttl=float(os.environ.get("ISA_KB_RESOLVE_CACHE_TTL", "300")),
+)
+
+# Paragraph IDs reported per grounded entity (caps the output size)
+_MAX_FOUND_IN = 5
+
+_ISA_PREFIX_RE = re.compile(r"^ISA\s*", re.IGNORECASE)
+# Trailing sub-paragraph qualifier, e.g. the "(a)" in "315.12(a)"
+_SUB_PARA_RE = re.compile(r"\(\w+\)$")
+
+# Claim terms for citation overlap: words of 4+ chars, minus stop words
+_CLAIM_TERM_RE = re.compile(r"\b\w{4,}\b")
+_STOP_WORDS = frozenset({
+    "the", "and", "for", "that", "this", "with", "from", "are", "was", "were",
+    "been", "have", "has", "not", "but", "can", "should", "shall", "may", "must",
+})
+
+# Contradiction patterns: pairs of opposing phrases
+_CONTRADICTION_PATTERNS: list[tuple[re.Pattern[str], re.Pattern[str]]] = [
+    (re.compile(pos), re.compile(neg))
+    for pos, neg in [
+        (r"\bshall\b", r"\bshall not\b"),
+        (r"\bmust\b", r"\bmust not\b"),
+        (r"\brequired\b", r"\bnot required\b"),
+        (r"\bprohibited\b", r"\bpermitted\b"),
+        (r"\bmandatory\b", r"\boptional\b"),
+        (r"\balways\b", r"\bnever\b"),
+    ]
+]
+
 
 # ---------------------------------------------------------------------------
 # 1. Entity Grounding Verification
@@ -72,7 +110,8 @@ def entity_verify(
     for row in rows:
         source_texts[row["id"]] = row.get("content", "").lower()
 
-    combined_source = " ".join(source_texts.values())
+    # Joined corpus for the fuzzy pass, built on first use only
+    combined_source: str | None = None
 
     details: list[dict[str, Any]] = []
     grounded_count = 0
@@ -80,17 +119,21 @@ def entity_verify(
     for entity in entities:
         entity_lower = entity.lower().strip()
 
-        # Check if entity appears in any source paragraph
-        found_in: list[str] = []
-        for pid, text in source_texts.items():
-            if entity_lower in text:
-                found_in.append(pid)
+        # Check if entity appears in any source paragraph; only the first
+        # _MAX_FOUND_IN matches are reported, so stop scanning there
+        found_in = list(islice(
+            (pid for pid, text in source_texts.items() if entity_lower in text),
+            _MAX_FOUND_IN,
+        ))
 
         # Also check for ISA reference patterns (e.g., "ISA 315" matches "ISA 315.12")
         is_grounded = len(found_in) > 0
-        if not is_grounded:
+        if not is_grounded and entity_lower.startswith("isa"):
             # Try fuzzy: strip "ISA" prefix and check numeric pattern
-            stripped = re.sub(r"^isa\s*", "", entity_lower)
+            # (without a prefix the per-paragraph scan above already failed)
+            stripped = _ISA_PREFIX_RE.sub("", entity_lower)
+            if combined_source is None:
+                combined_source = " ".join(source_texts.values())
             if stripped in combined_source:
                 is_grounded = True
                 found_in = ["fuzzy_match"]
@@ -101,7 +144,7 @@ def entity_verify(
         details.append({
             "entity": entity,
             "grounded": is_grounded,
-            "found_in": found_in[:5],  # Cap to avoid huge output
+            "found_in": found_in,
         })
 
     score = grounded_count / len(entities) if entities else 1.0
@@ -144,6 +187,25 @@ def citation_verify(
     if not citations:
         return {"score": 1.0, "passed": True, "details": [], "total_citations": 0}
 
+    # Batch every lookup up front: one query for cited IDs, one for cited
+    # refs (including the parents of sub-paragraph refs) instead of one or
+    # two round-trips per citation
+    cited_ids: list[str] = []
+    cited_refs: list[str] = []
+    for citation in citations:
+        pid = citation.get("paragraph_id", "")
+        pref = citation.get("paragraph_ref", "")
+        if pid:
+            cited_ids.append(pid)
+        elif pref:
+            cited_refs.append(_clean_ref(pref))
+        if pref and _SUB_PARA_RE.search(pref):
+            cited_refs.append(_clean_ref(_SUB_PARA_RE.sub("", pref).strip()))
+
+    fields = "id, content, paragraph_ref, isa_number"
+    by_id = _fetch_paragraphs("id", cited_ids, fields)
+    by_ref = _fetch_paragraphs("paragraph_ref", cited_refs, fields)
+
     details: list[dict[str, Any]] = []
     verified_count = 0
 
@@ -155,34 +217,18 @@ def citation_verify(
         # Look up the paragraph
         row = None
         if pid:
-            rows = execute_query(
-                "SELECT id, content, paragraph_ref, isa_number FROM ISAParagraph WHERE id = ?",
-                [pid],
-            )
-            if rows:
-                row = rows[0]
+            row = by_id.get(pid)
         elif pref:
             # Try by paragraph_ref
-            clean_ref = re.sub(r"^ISA\s*", "", pref, flags=re.IGNORECASE).strip()
-            rows = execute_query(
-                "SELECT id, content, paragraph_ref, isa_number FROM ISAParagraph WHERE paragraph_ref = ?",
-                [clean_ref],
-            )
-            if rows:
-                row = rows[0]
+            row = by_ref.get(_clean_ref(pref))
 
         if row is None:
             # Determine error category for not-found citations
             error_category = "NOT_FOUND"
-            if pref and re.search(r"\(\w+\)$", pref):
+            if pref and _SUB_PARA_RE.search(pref):
                 # Has a sub-paragraph qualifier like (a), (b) — might be SUB_PARA_NOT_FOUND
-                parent_ref = re.sub(r"\(\w+\)$", "", pref).strip()
-                parent_clean = re.sub(r"^ISA\s*", "", parent_ref, flags=re.IGNORECASE).strip()
-                parent_rows = execute_query(
-                    "SELECT id FROM ISAParagraph WHERE paragraph_ref = ?",
-                    [parent_clean],
-                )
-                if parent_rows:
+                parent_ref = _SUB_PARA_RE.sub("", pref).strip()
+                if _clean_ref(parent_ref) in by_ref:
                     error_category = "SUB_PARA_NOT_FOUND"
 
             details.append({
@@ -207,10 +253,9 @@ def citation_verify(
         claim_lower = claim.lower().strip()
 
         # Extract key terms from claim (words > 3 chars, skip stop words)
-        stop_words = {"the", "and", "for", "that", "this", "with", "from", "are", "was", "were", "been", "have", "has", "not", "but", "can", "should", "shall", "may", "must"}
         claim_terms = [
-            w for w in re.findall(r"\b\w{4,}\b", claim_lower)
-            if w not in stop_words
+            w for w in _CLAIM_TERM_RE.findall(claim_lower)
+            if w not in _STOP_WORDS
         ]
 
         if not claim_terms:
@@ -305,14 +350,30 @@ def relation_verify(
     details: list[dict[str, Any]] = []
     preserved_count = 0
 
+    # Resolve every endpoint in one batch
+    resolved = _resolve_paragraph_ids(
+        [rel.get(key, "") for rel in relations for key in ("source_paragraph", "target_paragraph")]
+    )
+
+    # Paragraphs of the same standard are implicitly related; every other
+    # resolved pair is checked against the edge tables in one query
+    pairs: list[tuple[str, str]] = []
+    for rel in relations:
+        src_row = resolved[rel.get("source_paragraph", "")]
+        dst_row = resolved[rel.get("target_paragraph", "")]
+        if src_row and dst_row and not _same_standard(src_row, dst_row):
+            pairs.append((src_row["id"], dst_row["id"]))
+    linked = _find_linked_pairs(pairs)
+
     for rel in relations:
         src = rel.get("source_paragraph", "")
         dst = rel.get("target_paragraph", "")
         rel_type = rel.get("relation_type", "")
 
-        # Resolve IDs if references were given
-        src_id = _resolve_paragraph_id(src)
-        dst_id = _resolve_paragraph_id(dst)
+        src_row = resolved[src]
+        dst_row = resolved[dst]
+        src_id = src_row["id"] if src_row else None
+        dst_id = dst_row["id"] if dst_row else None
 
         if not src_id or not dst_id:
             details.append({
@@ -324,47 +385,7 @@ def relation_verify(
             })
             continue
 
-        # Check edge tables for the relationship
-        edge_found = False
-
-        # Check cites table
-        cite_rows = execute_query(
-            "SELECT id FROM cites WHERE src_id = ? AND dst_id = ?",
-            [src_id, dst_id],
-        )
-        if cite_rows:
-            edge_found = True
-
-        # Check hop_edge table (broader)
-        if not edge_found:
-            hop_rows = execute_query(
-                "SELECT id FROM hop_edge WHERE src_id = ? AND dst_id = ?",
-                [src_id, dst_id],
-            )
-            if hop_rows:
-                edge_found = True
-
-        # Check reverse direction too (relationships may be bidirectional)
-        if not edge_found:
-            rev_rows = execute_query(
-                "SELECT id FROM cites WHERE src_id = ? AND dst_id = ? "
-                "UNION ALL "
-                "SELECT id FROM hop_edge WHERE src_id = ? AND dst_id = ?",
-                [dst_id, src_id, dst_id, src_id],
-            )
-            if rev_rows:
-                edge_found = True
-
-        # Also check if both paragraphs belong to the same standard (implicit relation)
-        if not edge_found:
-            same_std = execute_query(
-                "SELECT 1 FROM ISAParagraph a JOIN ISAParagraph b "
-                "ON a.isa_number = b.isa_number "
-                "WHERE a.id = ? AND b.id = ?",
-                [src_id, dst_id],
-            )
-            if same_std:
-                edge_found = True
+        edge_found = _same_standard(src_row, dst_row) or (src_id, dst_id) in linked
 
         if edge_found:
             preserved_count += 1
@@ -433,62 +454,73 @@ def contradiction_check(
     for row in rows:
         paragraphs[row["id"]] = row
 
-    # Contradiction patterns: pairs of opposing phrases
-    CONTRADICTION_PATTERNS: list[tuple[str, str]] = [
-        (r"\bshall\b", r"\bshall not\b"),
-        (r"\bmust\b", r"\bmust not\b"),
-        (r"\brequired\b", r"\bnot required\b"),
-        (r"\bprohibited\b", r"\bpermitted\b"),
-        (r"\bmandatory\b", r"\boptional\b"),
-        (r"\balways\b", r"\bnever\b"),
-    ]
+    # Scan each paragraph once per pattern into bitmasks (bit k set when
+    # pattern k's positive / negative phrase occurs); pairs then compare
+    # masks instead of rescanning
+    ids_list = list(paragraphs.keys())
+    contents = [paragraphs[pid].get("content", "").lower() for pid in ids_list]
+    pos_masks: list[int] = []
+    neg_masks: list[int] = []
+    for c in contents:
+        pos_mask = neg_mask = 0
+        for k, (pos, neg) in enumerate(_CONTRADICTION_PATTERNS):
+            if pos.search(c):
+                pos_mask |= 1 << k
+            if neg.search(c):
+                neg_mask |= 1 << k
+        pos_masks.append(pos_mask)
+        neg_masks.append(neg_mask)
+
+    # Only paragraphs about the same topic (same ISA number) can contradict
+    # each other, so pairs are drawn from per-standard buckets; each
+    # paragraph is paired with the bucket members listed after it
+    buckets: dict[Any, list[int]] = {}
+    slots: list[tuple[list[int], int]] = []  # (bucket, position in it)
+    for idx, pid in enumerate(ids_list):
+        bucket = buckets.setdefault(paragraphs[pid].get("isa_number"), [])
+        slots.append((bucket, len(bucket)))
+        bucket.append(idx)
 
     contradictions: list[dict[str, Any]] = []
     pairs_checked = 0
 
-    # Check all pairs (but limit to avoid quadratic explosion on large sets)
-    ids_list = list(paragraphs.keys())
+    # Check same-standard pairs (but limit to avoid quadratic explosion on
+    # large sets)
     max_pairs = 100  # Safety limit
     pair_count = 0
 
     for i in range(len(ids_list)):
-        for j in range(i + 1, len(ids_list)):
+        bucket, position = slots[i]
+        for j in bucket[position + 1:]:
             if pair_count >= max_pairs:
                 break
             pair_count += 1
             pairs_checked += 1
 
+            # Contradiction: one paragraph asserts X, the other negates X
+            hits = (pos_masks[i] & neg_masks[j]) | (neg_masks[i] & pos_masks[j])
+            if not hits:
+                continue
+
             p1 = paragraphs[ids_list[i]]
             p2 = paragraphs[ids_list[j]]
-            c1 = p1.get("content", "").lower()
-            c2 = p2.get("content", "").lower()
-
-            for pos_pattern, neg_pattern in CONTRADICTION_PATTERNS:
-                p1_has_pos = bool(re.search(pos_pattern, c1))
-                p1_has_neg = bool(re.search(neg_pattern, c1))
-                p2_has_pos = bool(re.search(pos_pattern, c2))
-                p2_has_neg = bool(re.search(neg_pattern, c2))
-
-                # Contradiction: one paragraph asserts X, the other negates X
-                # on the same topic (same ISA number or cross-referenced)
-                if (p1_has_pos and p2_has_neg) or (p1_has_neg and p2_has_pos):
-                    # Only flag if they're about the same topic
-                    same_isa = p1.get("isa_number") == p2.get("isa_number")
-                    if same_isa:
-                        contradictions.append({
-                            "paragraph_1": {
-                                "id": p1["id"],
-                                "ref": p1.get("paragraph_ref", ""),
-                                "excerpt": c1[:150],
-                            },
-                            "paragraph_2": {
-                                "id": p2["id"],
-                                "ref": p2.get("paragraph_ref", ""),
-                                "excerpt": c2[:150],
-                            },
-                            "pattern": f"{pos_pattern} vs {neg_pattern}",
-                            "severity": "potential",
-                        })
+
+            for k, (pos, neg) in enumerate(_CONTRADICTION_PATTERNS):
+                if hits >> k & 1:
+                    contradictions.append({
+                        "paragraph_1": {
+                            "id": p1["id"],
+                            "ref": p1.get("paragraph_ref", ""),
+                            "excerpt": contents[i][:150],
+                        },
+                        "paragraph_2": {
+                            "id": p2["id"],
+                            "ref": p2.get("paragraph_ref", ""),
+                            "excerpt": contents[j][:150],
+                        },
+                        "pattern": f"{pos.pattern} vs {neg.pattern}",
+                        "severity": "potential",
+                    })
 
     return {
         "contradiction_count": len(contradictions),
@@ -503,23 +535,119 @@ def contradiction_check(
 # ---------------------------------------------------------------------------
 
 
-def _resolve_paragraph_id(identifier: str) -> str | None:
-    """Resolve a paragraph ID or reference to an actual ID."""
-    if not identifier:
-        return None
+# A pair is linked if either edge table has an edge in either direction
+# (relationships may be bidirectional). Equi-joins only, so each branch
+# is a hash join against the pairs table.
+_LINKED_PAIRS_SQL = """
+WITH pairs(src, dst) AS (VALUES {values})
+SELECT p.src, p.dst FROM pairs p JOIN cites e ON e.src_id = p.src AND e.dst_id = p.dst
+UNION ALL
+SELECT p.src, p.dst FROM pairs p JOIN hop_edge e ON e.src_id = p.src AND e.dst_id = p.dst
+UNION ALL
+SELECT p.src, p.dst FROM pairs p JOIN cites e ON e.src_id = p.dst AND e.dst_id = p.src
+UNION ALL
+SELECT p.src, p.dst FROM pairs p JOIN hop_edge e ON e.src_id = p.dst AND e.dst_id = p.src
+"""
+
 
-    # Direct ID
-    if identifier.startswith("ip_") or identifier.startswith("gs_"):
-        rows = execute_query(
-            "SELECT id FROM ISAParagraph WHERE id = ?",
-            [identifier],
-        )
-        return rows[0]["id"] if rows else None
+def _find_linked_pairs(pairs: list[tuple[str, str]]) -> set[tuple[str, str]]:
+    """Return the ``(src_id, dst_id)`` pairs joined by an edge, in one query."""
+    pairs = list(dict.fromkeys(pairs))
+    if not pairs:
+        return set()
 
-    # Reference lookup
-    clean = re.sub(r"^ISA\s*", "", identifier, flags=re.IGNORECASE).strip()
+    params = [pid for pair in pairs for pid in pair]
     rows = execute_query(
-        "SELECT id FROM ISAParagraph WHERE paragraph_ref = ?",
-        [clean],
+        _LINKED_PAIRS_SQL.format(values=", ".join(["(?, ?)" for _ in pairs])),
+        params,
     )
-    return rows[0]["id"] if rows else None
+    return {(row["src"], row["dst"]) for row in rows}
+
+
+def _same_standard(a: dict[str, Any], b: dict[str, Any]) -> bool:
+    """Whether two resolved paragraphs belong to the same ISA standard."""
+    return a["isa_number"] is not None and a["isa_number"] == b["isa_number"]
+
+
+def _clean_ref(ref: str) -> str:
+    """Strip an optional ``ISA`` prefix from a paragraph reference."""
+    return _ISA_PREFIX_RE.sub("", ref).strip()
+
+
+def _fetch_paragraphs(
+    column: str, values: list[str], fields: str,
+) -> dict[str, dict[str, Any]]:
+    """Fetch paragraphs whose ``column`` is in ``values`` with one query.
+
+    Returns rows keyed by ``column``; when several rows share a value the
+    first one wins, as with a single-row lookup.
+    """
+    values = list(dict.fromkeys(v for v in values if v))
+    if not values:
+        return {}
+
+    placeholders = ", ".join(["?" for _ in values])
+    rows = execute_query(
+        f"SELECT {fields} FROM ISAParagraph WHERE {column} IN ({placeholders})",
+        values,
+    )
+    found: dict[str, dict[str, Any]] = {}
+    for row in rows:
+        found.setdefault(row[column], row)
+    return found
+
+
+def _resolve_paragraph_ids(
+    identifiers: list[str],
+) -> dict[str, dict[str, Any] | None]:
+    """Resolve paragraph IDs or references to paragraphs in one batch.
+
+    Cached per identifier in ``_resolved_cache`` (LRU + TTL, like the
+    search caches): only identifiers not seen recently are looked up.
+    Cleared by ``clear_caches()``.
+
+    Returns a mapping from each identifier to its paragraph's ``id`` and
+    ``isa_number``, or None when it does not exist.
+    """
+    resolved: dict[str, dict[str, Any] | None] = {}
+    for identifier in dict.fromkeys(identifiers):
+        cached = _resolved_cache.get(identifier)
+        if cached is not None:
+            resolved[identifier] = cached or None
+
+    ids: list[str] = []
+    refs: list[str] = []
+    for identifier in identifiers:
+        if identifier in resolved:
+            continue
+        if identifier.startswith("ip_") or identifier.startswith("gs_"):
+            ids.append(identifier)
+        elif identifier:
+            refs.append(_clean_ref(identifier))
+
+    by_id = _fetch_paragraphs("id", ids, "id, isa_number")
+    by_ref = _fetch_paragraphs("paragraph_ref", refs, "id, paragraph_ref, isa_number")
+
+    fresh: dict[str, dict[str, Any] | None] = {}
+    for identifier in identifiers:
+        if identifier in resolved or identifier in fresh:
+            continue
+        if not identifier:
+            fresh[identifier] = None
+        elif identifier.startswith("ip_") or identifier.startswith("gs_"):
+            # Direct ID
+            fresh[identifier] = by_id.get(identifier)
+        else:
+            # Reference lookup
+            fresh[identifier] = by_ref.get(_clean_ref(identifier))
+
+    for identifier, row in fresh.items():
+        _resolved_cache.put(identifier, row or {})
+
+    resolved.update(fresh)
+    return resolved
+
+
+def clear_caches() -> None:
+    """Drop memoized paragraph resolutions (call when the DB is reopened)."""
+    _resolved_cache.clear()
@@ -9,9 +9,14 @@ configured. The feature degrades, never fails.
 
 from __future__ import annotations
 
+import json
 import logging
 import os
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Any
 
 import httpx
@@ -29,6 +34,52 @@ PREFERRED_DOMAINS = [
     "accountancyeurope.eu",
 ]
 
+# Any preferred domain, as a substring of a lowercased URL
+_PREFERRED_DOMAIN_RE = re.compile("|".join(re.escape(d) for d in PREFERRED_DOMAINS))
+
+# ISA standard numbers mentioned in result text (e.g. "ISA 315")
+_ISA_NUMBER_RE = re.compile(r"ISA\s+(\d{3})", re.IGNORECASE)
+
+# Worker threads for concurrent Brave queries (one call sends 3-5)
+_query_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("ISA_KB_WEB_SEARCH_WORKERS", "5")),
+    thread_name_prefix="isa-web",
+)
+
+# Process-wide HTTP client: keeps Brave connections (and their TLS
+# sessions) alive across calls. Created on first use.
+_client: httpx.Client | None = None
+_client_lock = threading.Lock()
+
+
+def _get_client() -> httpx.Client:
+    """Return the shared Brave HTTP client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(
+                    timeout=15.0,
+                    limits=httpx.Limits(max_keepalive_connections=8),
+                )
+    return _client
+
+
+# API keys that got a 401, with the time of rejection. Calls with such a
+# key return immediately for _AUTH_RETRY_SECONDS instead of sending
+# queries that are bound to fail.
+_AUTH_RETRY_SECONDS = float(os.environ.get("ISA_KB_BRAVE_AUTH_RETRY_SECONDS", "300"))
+_rejected_keys: dict[str, float] = {}
+
+
+def close_web_search() -> None:
+    """Close the shared HTTP client on shutdown."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
 
 def web_search(
     queries: list[str],
@@ -75,6 +126,17 @@ def web_search(
             "warnings": [],
         }
 
+    # A key Brave just rejected would fail every query again: skip the
+    # fan-out until the retry window passes (or the key changes)
+    rejected_at = _rejected_keys.get(api_key)
+    if rejected_at is not None and time.monotonic() - rejected_at < _AUTH_RETRY_SECONDS:
+        return {
+            "results": [],
+            "analysis_hints": [],
+            "queries_executed": 0,
+            "warnings": ["Brave API key was rejected (401). Web search is paused."],
+        }
+
     all_results: list[dict[str, Any]] = []
     warnings: list[str] = []
 
@@ -84,28 +146,43 @@ def web_search(
         "X-Subscription-Token": api_key,
     }
 
-    for query in queries:
-        try:
-            results = _execute_brave_query(
-                query,
-                headers=headers,
-                max_results=max_results_per_query,
-            )
-            all_results.extend(results)
-        except httpx.HTTPStatusError as exc:
-            if exc.response.status_code == 401:
-                warnings.append(f"Brave API authentication failed for query: {query[:50]}")
-                break  # All subsequent queries will also fail
-            elif exc.response.status_code == 429:
-                warnings.append("Brave API rate limit reached. Stopping web search.")
-                break
-            else:
-                warnings.append(f"Brave API error ({exc.response.status_code}) for: {query[:50]}")
-        except httpx.TimeoutException:
-            warnings.append(f"Brave API timeout for: {query[:50]}")
-        except Exception as exc:
-            logger.warning("Web search error for query '%s': %s", query[:50], exc)
-            warnings.append(f"Web search error: {exc}")
+    # Queries are I/O-bound: run them concurrently over the shared client,
+    # then collect in query order so results and warnings match a
+    # sequential run
+    client = _get_client()
+    futures = [
+        _query_executor.submit(
+            _execute_brave_query,
+            query,
+            client=client,
+            headers=headers,
+            max_results=max_results_per_query,
+        )
+        for query in queries
+    ]
+    try:
+        for query, future in zip(queries, futures):
+            try:
+                all_results.extend(future.result())
+            except httpx.HTTPStatusError as exc:
+                if exc.response.status_code == 401:
+                    _rejected_keys[api_key] = time.monotonic()
+                    warnings.append(f"Brave API authentication failed for query: {query[:50]}")
+                    break  # All subsequent queries will also fail
+                elif exc.response.status_code == 429:
+                    warnings.append("Brave API rate limit reached. Stopping web search.")
+                    break
+                else:
+                    warnings.append(f"Brave API error ({exc.response.status_code}) for: {query[:50]}")
+            except httpx.TimeoutException:
+                warnings.append(f"Brave API timeout for: {query[:50]}")
+            except Exception as exc:
+                logger.warning("Web search error for query '%s': %s", query[:50], exc)
+                warnings.append(f"Web search error: {exc}")
+    finally:
+        # Drop queries that have not started
+        for future in futures:
+            future.cancel()
 
     # Deduplicate by URL
     seen_urls: set[str] = set()
@@ -137,6 +214,7 @@ def web_search(
 def _execute_brave_query(
     query: str,
     *,
+    client: httpx.Client,
     headers: dict[str, str],
     max_results: int = 5,
 ) -> list[dict[str, Any]]:
@@ -144,6 +222,7 @@ def _execute_brave_query(
 
     Args:
         query: Search query string.
+        client: Shared HTTP client (see ``_get_client``).
         headers: HTTP headers including API key.
         max_results: Maximum results.
 
@@ -159,11 +238,12 @@ def _execute_brave_query(
         "count": str(max_results),
     }
 
-    with httpx.Client(timeout=15.0) as client:
-        response = client.get(BRAVE_API_URL, headers=headers, params=params)
-        response.raise_for_status()
+    response = client.get(BRAVE_API_URL, headers=headers, params=params)
+    response.raise_for_status()
 
-    data = response.json()
+    # Parse the raw bytes: json detects the UTF encoding itself, skipping
+    # httpx's charset sniffing and intermediate str decode
+    data = json.loads(response.content)
     web_results = data.get("web", {}).get("results", [])
 
     results: list[dict[str, Any]] = []
@@ -185,6 +265,12 @@ def _execute_brave_query(
     return results
 
 
+@lru_cache(maxsize=256)
+def _query_terms(query: str) -> frozenset[str]:
+    """Lowercased terms (3+ chars) of a query, shared by all its results."""
+    return frozenset(re.findall(r"\b\w{3,}\b", query.lower()))
+
+
 def _score_relevance(
     query: str,
     title: str,
@@ -201,18 +287,15 @@ def _score_relevance(
     score = 0.0
 
     # Term overlap (0-0.5)
-    query_terms = set(re.findall(r"\b\w{3,}\b", query.lower()))
+    query_terms = _query_terms(query)
     combined = (title + " " + snippet).lower()
     if query_terms:
         matching = sum(1 for t in query_terms if t in combined)
         score += 0.5 * (matching / len(query_terms))
 
     # Domain preference (0-0.25)
-    url_lower = url.lower()
-    for domain in PREFERRED_DOMAINS:
-        if domain in url_lower:
-            score += 0.25
-            break
+    if _PREFERRED_DOMAIN_RE.search(url.lower()):
+        score += 0.25
 
     # Snippet quality (0-0.25)
     if len(snippet) > 100:
@@ -241,12 +324,22 @@ def _generate_analysis_hints(
 
     hints: list[str] = []
 
-    # Count ISA number mentions across all results
+    # One pass: ISA number mentions, preferred-domain and high-relevance
+    # counts
     isa_mentions: dict[str, int] = {}
+    preferred_count = 0
+    high_rel_count = 0
+    top_high_rel: dict[str, Any] | None = None
     for r in results:
         text = r.get("title", "") + " " + r.get("snippet", "")
-        for match in re.findall(r"ISA\s+(\d{3})", text, re.IGNORECASE):
+        for match in _ISA_NUMBER_RE.findall(text):
             isa_mentions[match] = isa_mentions.get(match, 0) + 1
+        if _PREFERRED_DOMAIN_RE.search(r.get("url", "").lower()):
+            preferred_count += 1
+        if r.get("relevance_score", 0) >= 0.6:
+            high_rel_count += 1
+            if top_high_rel is None:
+                top_high_rel = r
 
     if isa_mentions:
         top_isas = sorted(isa_mentions, key=lambda x: -isa_mentions[x])[:5]
@@ -256,10 +349,6 @@ def _generate_analysis_hints(
         )
 
     # Check for preferred domain presence
-    preferred_count = sum(
-        1 for r in results
-        if any(d in r.get("url", "").lower() for d in PREFERRED_DOMAINS)
-    )
     if preferred_count > 0:
         hints.append(
             f"{preferred_count}/{len(results)} results from authoritative "
@@ -267,11 +356,10 @@ def _generate_analysis_hints(
         )
 
     # High-relevance results
-    high_rel = [r for r in results if r.get("relevance_score", 0) >= 0.6]
-    if high_rel:
+    if top_high_rel is not None:
         hints.append(
-            f"{len(high_rel)} high-relevance results found. "
-            f"Top: \"{high_rel[0].get('title', '')}\"."
+            f"{high_rel_count} high-relevance results found. "
+            f"Top: \"{top_high_rel.get('title', '')}\"."
         )
 
     return hints
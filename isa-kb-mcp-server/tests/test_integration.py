@@ -133,6 +133,17 @@ def test_query_expand_no_expansion_needed():
     print("PASS: Query without acronyms is unchanged")
 
 
+def test_query_expand_dedupes_shared_expansion():
+    """Acronyms sharing an expansion (RMM/ROMM) should append it only once."""
+    from isa_kb_mcp_server.query_expand import expand_query
+
+    result = expand_query("RMM vs ROMM")
+    count = result.lower().count("risk of material misstatement")
+    assert count == 1, f"Expected expansion once, found {count} in: {result}"
+
+    print("PASS: Query expansion dedupes shared expansions")
+
+
 def test_expand_with_synonyms():
     """expand_with_synonyms returns [original, expanded] or [original] if no expansion."""
     from isa_kb_mcp_server.query_expand import expand_with_synonyms
@@ -153,6 +164,19 @@ def test_expand_with_synonyms():
     print("PASS: expand_with_synonyms returns correct variants")
 
 
+def test_expand_with_synonyms_returns_fresh_list():
+    """Mutating a returned variants list must not leak into the cache."""
+    from isa_kb_mcp_server.query_expand import expand_with_synonyms
+
+    first = expand_with_synonyms("TCWG communication")
+    first.append("mutated")
+    second = expand_with_synonyms("TCWG communication")
+    assert "mutated" not in second, f"Cached variants were mutated: {second}"
+    assert len(second) == 2, f"Expected 2 variants, got {second}"
+
+    print("PASS: expand_with_synonyms returns a fresh list per call")
+
+
 # ============================================================
 # Reranker — Graceful Fallback
 # ============================================================
@@ -200,6 +224,25 @@ def test_reranker_top_k():
     print("PASS: Reranker respects top_k limit")
 
 
+def test_rerank_top_k_indices_matches_stable_sort():
+    """Partial top-k selection should match a stable descending sort."""
+    import random
+
+    import numpy as np
+
+    from isa_kb_mcp_server.rerank import _top_k_indices
+
+    rng = random.Random(7)
+    for n in (0, 1, 5, 50):
+        scores = [rng.choice([0.1, 0.5, 0.5, 0.9]) for _ in range(n)]
+        expected = sorted(range(n), key=lambda i: -scores[i])
+        for k in (0, 1, 3, n, n + 2):
+            got = _top_k_indices(np.array(scores, dtype=np.float64), k).tolist()
+            assert got == expected[:k], f"n={n} k={k}: {got} != {expected[:k]}"
+
+    print("PASS: Rerank top-k selection matches stable sort")
+
+
 # ============================================================
 # Context Formatting — Mixed Guide + ISA
 # ============================================================
@@ -493,11 +536,14 @@ if __name__ == '__main__':
         test_query_expand_no_duplicates,
         test_query_expand_case_insensitive,
         test_query_expand_no_expansion_needed,
+        test_query_expand_dedupes_shared_expansion,
         test_expand_with_synonyms,
+        test_expand_with_synonyms_returns_fresh_list,
         # Reranker
         test_reranker_fallback,
         test_reranker_empty_input,
         test_reranker_top_k,
+        test_rerank_top_k_indices_matches_stable_sort,
         # Context formatting
         test_context_mixed_tiers,
         test_context_guide_only,
@@ -84,6 +84,375 @@ def test_rrf_fusion():
     print("PASS: RRF fusion correctly ranks items in both lists highest")
 
 
+def test_rrf_fusion_counts_repeated_ids_once():
+    """An id repeated within one list should score only at its best rank."""
+    from isa_kb_mcp_server.search import _rrf_fuse
+
+    keyword_results = [{'id': 'a'}, {'id': 'b'}, {'id': 'a'}]
+    vector_results = [{'id': 'b'}, {'id': 'c'}, {'id': 'b'}]
+
+    fused = {r['id']: r['rrf_score'] for r in _rrf_fuse(keyword_results, vector_results, k=60)}
+    assert fused == {
+        'a': round(1 / 61, 6),
+        'b': round(1 / 62 + 1 / 61, 6),
+        'c': round(1 / 62, 6),
+    }, fused
+
+    # Long lists fuse the same way (legs grow with max_results)
+    long_kw = [{'id': f'k{i}'} for i in range(800)] + [{'id': 'k0'}]
+    long_vec = [{'id': f'k{i}'} for i in range(0, 1600, 2)]
+    fused = {r['id']: r['rrf_score'] for r in _rrf_fuse(long_kw, long_vec, k=60)}
+    assert fused['k0'] == round(2 / 61, 6)
+    assert fused['k1'] == round(1 / 62, 6)
+
+    print("PASS: RRF fusion counts repeated ids once, at their best rank")
+
+
+# ============================================================
+# Reference Resolution Caching
+# ============================================================
+
+def test_resolve_paragraph_id_is_cached():
+    """Equivalent reference spellings should resolve with a single DB lookup."""
+    from unittest.mock import patch
+    from isa_kb_mcp_server import graph
+
+    graph.clear_caches()
+    with patch.object(graph, 'execute_query', return_value=[{'id': 'ip_315_12'}]) as mock_query:
+        assert graph._resolve_paragraph_id('315.12') == 'ip_315_12'
+        assert graph._resolve_paragraph_id('ISA 315.12') == 'ip_315_12'
+        assert graph._resolve_paragraph_id(' isa 315.12 ') == 'ip_315_12'
+    graph.clear_caches()
+
+    assert mock_query.call_count == 1, f"Expected 1 DB lookup, got {mock_query.call_count}"
+
+    print("PASS: Reference resolution is memoized on the canonical reference")
+
+
+def test_hop_retrieve_arrow_matches_dicts():
+    """The arrow result format should hold the same rows, in order, as dicts."""
+    import os
+    import tempfile
+    from unittest.mock import patch
+    import duckdb
+    from isa_kb_mcp_server import db, graph
+
+    schema = os.path.join(os.path.dirname(db.__file__), 'schema.sql')
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'isa_kb.duckdb')
+        conn = duckdb.connect(path)
+        conn.execute(open(schema, encoding='utf-8').read())
+        for n in range(1, 7):
+            conn.execute(
+                "INSERT INTO ISAParagraph (id, isa_number, para_num, paragraph_ref, content, page_number, source_doc) "
+                "VALUES (?, '315', ?, ?, ?, ?, 'ISA_315')",
+                [f'ip_315_{n}', str(n), f'315.{n}', f'Paragraph {n} text', n],
+            )
+        edges = [('ip_315_1', 'ip_315_2', 0.9), ('ip_315_1', 'ip_315_3', 0.6),
+                 ('ip_315_2', 'ip_315_4', 0.95), ('ip_315_3', 'ip_315_5', 0.85),
+                 ('ip_315_4', 'ip_315_6', 0.9), ('ip_315_5', 'ip_315_1', 0.9)]
+        for i, (src, dst, weight) in enumerate(edges):
+            conn.execute(
+                "INSERT INTO hop_edge (id, src_id, dst_id, weight, hop_type) VALUES (?, ?, ?, ?, 'cross_ref')",
+                [f'he_{i}', src, dst, weight],
+            )
+        conn.close()
+
+        ro = duckdb.connect(path, read_only=True)
+        try:
+            with patch.object(db, '_connection', ro):
+                dicts = graph.hop_retrieve('ip_315_1', max_results=4)
+                arrow = graph.hop_retrieve('ip_315_1', max_results=4, result_format='arrow')
+                try:
+                    graph.hop_retrieve('ip_315_1', result_format='json')
+                    raise AssertionError("Expected ValueError for an unknown result_format")
+                except ValueError:
+                    pass
+        finally:
+            ro.close()
+
+    assert 'error' not in dicts and 'error' not in arrow
+    ids = [r['id'] for r in dicts['connected']]
+    assert len(ids) == 4
+    assert arrow['connected_table'].column('id').to_pylist() == ids
+    assert arrow['connected_table'].to_pylist() == dicts['connected']
+    assert arrow['total_found'] == dicts['total_found'] == 4
+
+    print("PASS: hop_retrieve arrow format matches the dict format")
+
+
+def test_parse_isa_ref():
+    """Paragraph reference parser should split every supported format."""
+    from isa_kb_mcp_server.paragraphs import parse_isa_ref
+
+    assert parse_isa_ref("315.12") == ("315", "12", None, None)
+    assert parse_isa_ref("315.12(a)") == ("315", "12", "a", None)
+    assert parse_isa_ref("315.12(a).A2") == ("315", "12", "a", "A2")
+    assert parse_isa_ref("200.5.A5") == ("200", "5", None, "A5")
+    assert parse_isa_ref("240.A10") == ("240", None, None, "A10")
+    assert parse_isa_ref("315.12(B)") == ("315", "12", None, None)
+    assert parse_isa_ref("315") == (None, None, None, None)
+    assert parse_isa_ref("315.A") == (None, None, None, None)
+
+    print("PASS: parse_isa_ref handles all reference formats")
+
+
+def test_related_lookup_failure_is_retried():
+    """A failed relation lookup should not be cached, in either lookup path."""
+    from unittest.mock import patch
+    from isa_kb_mcp_server import paragraphs
+
+    row = {'id': 'ip_315_12', 'paragraph_ref': '315.12', 'isa_number': '315', 'content': 'risk'}
+    related_row = {'id': 'is_315', 'isa_number': '315', 'title': 'ISA 315', 'relation': 'belongs_to'}
+    calls = {'related': 0}
+
+    def fake_query(sql, params=None):
+        if 'UNION ALL' in sql:
+            calls['related'] += 1
+            if calls['related'] == 1:
+                raise RuntimeError('transient DuckDB error')
+            return [related_row]
+        return [row]
+
+    paragraphs.clear_caches()
+    with patch.object(paragraphs, 'execute_query', side_effect=fake_query):
+        first = paragraphs.get_paragraph('ISA 315.12')
+        second = paragraphs.get_paragraph('ISA 315.12')
+        third = paragraphs.get_paragraph('315.12')
+    paragraphs.clear_caches()
+
+    assert first['found'] and first['related'] == []
+    assert [r['id'] for r in second['related']] == ['is_315']
+    assert [r['id'] for r in third['related']] == ['is_315']
+    assert calls['related'] == 2, f"Expected 2 relation lookups, got {calls['related']}"
+
+    print("PASS: Failed relation lookups are retried, not cached")
+
+
+def test_paragraph_lookups_return_copies():
+    """Mutating a paragraph or standards result must not alter the cache."""
+    from unittest.mock import patch
+    from isa_kb_mcp_server import paragraphs
+
+    rows = [
+        {'id': 'ip_315_12', 'paragraph_ref': '315.12(a)', 'isa_number': '315', 'content': 'risk'},
+        {'id': 'ip_315_12b', 'paragraph_ref': '315.12(a)', 'isa_number': '315', 'content': 'more'},
+    ]
+    related_row = {'id': 'is_315', 'isa_number': '315', 'title': 'ISA 315', 'relation': 'belongs_to'}
+    standard_row = {'id': 'is_315', 'isa_number': '315', 'title': 'ISA 315', 'paragraph_count': 2}
+
+    def fake_query(sql, params=None):
+        if 'UNION ALL' in sql:
+            return [related_row]
+        if 'FROM ISAStandard s' in sql:
+            return [standard_row]
+        return [] if 'paragraph_ref = ?' in sql else rows
+
+    paragraphs.clear_caches()
+    with patch.object(paragraphs, 'execute_query', side_effect=fake_query):
+        first = paragraphs.get_paragraph('315.12(a)')
+        first['paragraph']['content'] = 'changed'
+        first['related'][0]['title'] = 'changed'
+        first['additional_matches'][0]['content'] = 'changed'
+        second = paragraphs.get_paragraph('315.12(a)')
+
+        standards = paragraphs.list_standards()
+        standards['standards'][0]['title'] = 'changed'
+        standards_again = paragraphs.list_standards()
+    paragraphs.clear_caches()
+
+    assert second['paragraph']['content'] == 'risk'
+    assert second['related'][0]['title'] == 'ISA 315'
+    assert second['additional_matches'][0]['content'] == 'more'
+    assert standards_again['standards'][0]['title'] == 'ISA 315'
+
+    print("PASS: Paragraph and standards lookups return copies of cached data")
+
+
+def test_query_embedding_is_cached():
+    """Repeated queries should reuse the cached embedding, not call Voyage again."""
+    from unittest.mock import patch
+    from isa_kb_mcp_server import search
+
+    search._embedding_cache.clear()
+    with patch.object(search, 'get_embedding', return_value=[0.1, 0.2]) as mock_embed:
+        assert search._embed_query('going concern') == [0.1, 0.2]
+        assert search._embed_query('going concern') == [0.1, 0.2]
+        assert search._embed_query('fraud risk') == [0.1, 0.2]
+    search._embedding_cache.clear()
+
+    assert mock_embed.call_count == 2, f"Expected 2 embed calls, got {mock_embed.call_count}"
+
+    print("PASS: Query embeddings are cached per query")
+
+
+def test_concurrent_query_embeddings_share_one_call():
+    """Concurrent misses for the same query should trigger a single Voyage call."""
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from unittest.mock import patch
+    from isa_kb_mcp_server import search
+
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_embedding(text):
+        started.set()
+        release.wait(timeout=5)
+        return [0.3, 0.4]
+
+    search._embedding_cache.clear()
+    with patch.object(search, 'get_embedding', side_effect=slow_embedding) as mock_embed:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(search._embed_query, 'materiality') for _ in range(4)]
+            assert started.wait(timeout=5), "Embedding call never started"
+            release.set()
+            results = [f.result(timeout=5) for f in futures]
+    search._embedding_cache.clear()
+
+    assert results == [[0.3, 0.4]] * 4
+    assert mock_embed.call_count == 1, f"Expected 1 embed call, got {mock_embed.call_count}"
+    assert not search._embed_inflight
+
+    print("PASS: Concurrent query embeddings share one call")
+
+
+def test_embedding_batcher_sends_lone_requests_at_once():
+    """A lone query is embedded without waiting out the batch window."""
+    import time
+    from unittest.mock import patch
+    from isa_kb_mcp_server import vectors
+
+    batcher = vectors._EmbeddingBatcher(window=5.0, max_batch=8, workers=1)
+    with patch.object(vectors, '_embed_texts', side_effect=lambda texts: [[len(t)] for t in texts]) as mock_embed:
+        start = time.monotonic()
+        assert batcher.embed('going concern') == [13]
+        elapsed = time.monotonic() - start
+
+    assert elapsed < 1.0, f"Lone request waited {elapsed:.2f}s for the batch window"
+    assert mock_embed.call_args.args[0] == ['going concern']
+
+    print("PASS: Embedding batcher sends lone requests immediately")
+
+
+def test_embedding_batcher_coalesces_pending_requests():
+    """Requests queued behind a busy call go out together, deduplicated."""
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from unittest.mock import patch
+    from isa_kb_mcp_server import vectors
+
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fake_embed(texts):
+        calls.append(list(texts))
+        if len(calls) == 1:
+            started.set()
+            release.wait(timeout=5)
+            raise RuntimeError('Voyage AI rate limit')
+        return [[len(t)] for t in texts]
+
+    batcher = vectors._EmbeddingBatcher(window=0.05, max_batch=8, workers=1)
+
+    # Signal once the three follow-up requests are all on the queue
+    queued = threading.Semaphore(0)
+    queue_put = batcher._queue.put
+
+    def counting_put(item, *args, **kwargs):
+        queue_put(item, *args, **kwargs)
+        queued.release()
+
+    with patch.object(vectors, '_embed_texts', side_effect=fake_embed), \
+         patch.object(batcher._queue, 'put', side_effect=counting_put):
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            first = pool.submit(batcher.embed, 'materiality')
+            assert queued.acquire(timeout=5), "First request was never queued"
+            assert started.wait(timeout=5), "First batch never reached the API"
+            pending = [pool.submit(batcher.embed, t) for t in ('fraud', 'fraud', 'sampling')]
+            for _ in pending:
+                assert queued.acquire(timeout=5), "Follow-up requests were never queued"
+            release.set()
+            try:
+                first.result(timeout=5)
+                raise AssertionError("Expected the API error to reach the caller")
+            except RuntimeError:
+                pass
+            results = [f.result(timeout=5) for f in pending]
+
+    assert results == [[5], [5], [8]]
+    assert calls == [['materiality'], ['fraud', 'sampling']], f"Unexpected batches: {calls}"
+
+    print("PASS: Embedding batcher coalesces pending requests into one call")
+
+
+def test_guide_filter_pushed_into_vector_search():
+    """guide_filter should reach LanceDB rather than post-filter the hits."""
+    from unittest.mock import patch
+    from isa_kb_mcp_server import search
+
+    row = {'id': 'gs_1', 'source_doc': 'ISA_LCE', '_distance': 0.2}
+    with patch.object(search, 'is_vector_search_available', return_value=True), \
+         patch.object(search, '_embed_query', return_value=[0.1, 0.2]), \
+         patch.object(search, 'search_vectors', return_value=[row]) as mock_search:
+        results, used = search._guide_vector_search('going concern', max_results=5, guide_filter='ISA_LCE')
+
+    assert used and results == [row]
+    assert mock_search.call_args.kwargs['guide_filter'] == 'ISA_LCE'
+    assert mock_search.call_args.kwargs['table_name'] == 'guides'
+
+    print("PASS: guide_filter is pushed into the vector search")
+
+
+def test_hybrid_keyword_shortcircuit():
+    """A strong keyword hit should skip the vector leg when a threshold is set."""
+    from unittest.mock import patch
+    from isa_kb_mcp_server import search
+
+    strong = {'id': 'ip_315_12', 'content': 'risk assessment', 'score': 7.5, 'confidence': 7.5}
+    weak = dict(strong, score=0.5, confidence=0.5)
+
+    search.clear_caches()
+    with patch.object(search, '_KEYWORD_SHORTCIRCUIT_THRESHOLD', 5.0), \
+         patch.object(search, '_keyword_search', return_value=[strong]), \
+         patch.object(search, '_vector_search', return_value=([], False)) as mock_vec:
+        response = search.hybrid_search('risk assessment procedures')
+    assert not mock_vec.called
+    assert response['search_type_used'] == 'keyword'
+    assert response['results'][0]['id'] == 'ip_315_12'
+    assert any('skipped' in w for w in response['warnings'])
+
+    with patch.object(search, '_KEYWORD_SHORTCIRCUIT_THRESHOLD', 5.0), \
+         patch.object(search, '_keyword_search', return_value=[weak]), \
+         patch.object(search, '_vector_search', return_value=([], False)) as mock_vec:
+        search.hybrid_search('risk assessment procedures')
+    assert mock_vec.called
+    search.clear_caches()
+
+    print("PASS: Hybrid search skips the vector leg on strong keyword matches")
+
+
+def test_search_result_cache_returns_copies():
+    """Repeated searches should hit the cache and never share result dicts."""
+    from unittest.mock import patch
+    from isa_kb_mcp_server import search
+
+    row = {'id': 'ip_1', 'paragraph_ref': '315.12', 'content': 'risk', 'score': 1.5}
+    search.clear_caches()
+    with patch.object(search, '_keyword_search', return_value=[row]) as mock_kw:
+        first = search.hybrid_search('risk', search_type='keyword')
+        first['results'][0]['tier'] = 2
+        second = search.hybrid_search('risk', search_type='keyword')
+    search.clear_caches()
+
+    assert mock_kw.call_count == 1, f"Expected 1 keyword query, got {mock_kw.call_count}"
+    assert 'tier' not in second['results'][0], "Cached result was mutated by caller"
+    assert second['results'][0]['id'] == 'ip_1'
+
+    print("PASS: Search responses are cached and copied on read")
+
+
 # ============================================================
 # Cross-Reference Extraction
 # ============================================================
@@ -300,6 +669,46 @@ def test_web_search_no_api_key():
     print("PASS: Web search gracefully returns empty when no API key")
 
 
+def test_web_search_runs_queries_concurrently():
+    """Brave queries should run in parallel and report in query order."""
+    import threading
+    from unittest.mock import patch
+    import httpx
+    from isa_kb_mcp_server import web_search as ws
+
+    # Each fake query waits for all three: a sequential loop would time out
+    barrier = threading.Barrier(3, timeout=5)
+
+    def fake_query(query, *, client, headers, max_results):
+        barrier.wait()
+        if query == "b":
+            request = httpx.Request("GET", ws.BRAVE_API_URL)
+            raise httpx.HTTPStatusError(
+                "unauthorized", request=request, response=httpx.Response(401, request=request),
+            )
+        return [{"title": query, "url": f"https://example.com/{query}",
+                 "snippet": "", "relevance_score": 0.5, "query": query}]
+
+    with patch.dict(os.environ, {"BRAVE_API_KEY": "test-key"}), \
+         patch.object(ws, "_execute_brave_query", side_effect=fake_query):
+        result = ws.web_search(["a", "b", "c"])
+
+    # The 401 stops collection, as in a sequential run
+    assert [r["query"] for r in result["results"]] == ["a"]
+    assert result["warnings"] == ["Brave API authentication failed for query: b"]
+
+    # The rejected key short-circuits the next call without any requests
+    with patch.dict(os.environ, {"BRAVE_API_KEY": "test-key"}), \
+         patch.object(ws, "_execute_brave_query") as mock_query:
+        result = ws.web_search(["a"])
+    ws._rejected_keys.clear()
+
+    assert mock_query.call_count == 0
+    assert result["queries_executed"] == 0 and result["results"] == []
+
+    print("PASS: Web search runs queries concurrently")
+
+
 # ============================================================
 # Web Search: Relevance Scoring
 # ============================================================
@@ -459,6 +868,41 @@ def test_citation_verify_term_overlap():
     print("PASS: Citation term overlap threshold works correctly with edge cases")
 
 
+def test_citation_verify_batches_lookups():
+    """Citation lookups should take one query for IDs and one for refs."""
+    from unittest.mock import patch
+    from isa_kb_mcp_server import verify
+
+    paragraphs = [
+        {"id": "ip_315_12", "content": "The auditor shall assess risk.",
+         "paragraph_ref": "315.12", "isa_number": "315"},
+        {"id": "ip_200_3", "content": "Governance and controls.",
+         "paragraph_ref": "200.3", "isa_number": "200"},
+    ]
+
+    def fake_query(sql, params):
+        column = "id" if "WHERE id IN" in sql else "paragraph_ref"
+        return [p for p in paragraphs if p[column] in params]
+
+    citations = [
+        {"paragraph_id": "ip_315_12", "claim": "auditor assess risk"},
+        {"paragraph_ref": "ISA 200.3", "claim": "governance controls"},
+        {"paragraph_ref": "315.12(b)", "claim": "x"},
+        {"paragraph_id": "ip_missing", "claim": "abc"},
+    ]
+    with patch.object(verify, "execute_query", side_effect=fake_query) as mock_query:
+        result = verify.citation_verify(citations)
+
+    assert mock_query.call_count == 2, f"Expected 2 queries, got {mock_query.call_count}"
+    details = result["details"]
+    assert details[0]["exists"] and details[0]["supports_claim"]
+    assert details[1]["paragraph_id"] == "ip_200_3"
+    assert details[2]["error_category"] == "SUB_PARA_NOT_FOUND"
+    assert details[3]["error_category"] == "NOT_FOUND"
+
+    print("PASS: Citation verify batches paragraph lookups")
+
+
 # ============================================================
 # Relation Verify — Implicit Same-ISA Detection
 # ============================================================
@@ -494,6 +938,43 @@ def test_relation_verify_implicit():
     print("PASS: Implicit same-ISA relation detection works correctly")
 
 
+def test_relation_verify_batches_edge_lookups():
+    """All relations should be checked with one resolve and one edge query."""
+    from unittest.mock import patch
+    from isa_kb_mcp_server import verify
+
+    def fake_query(sql, params):
+        if "WITH pairs" in sql:
+            # Same-standard pairs are settled without an edge lookup
+            assert params == ["ip_200_1", "ip_500_1", "ip_240_1", "ip_500_1"]
+            return [{"src": "ip_200_1", "dst": "ip_500_1"}]
+        return [
+            {"id": pid, "isa_number": pid.split("_")[1]}
+            for pid in params if pid != "ip_missing"
+        ]
+
+    relations = [
+        {"source_paragraph": "ip_315_1", "target_paragraph": "ip_315_2"},
+        {"source_paragraph": "ip_200_1", "target_paragraph": "ip_500_1"},
+        {"source_paragraph": "ip_240_1", "target_paragraph": "ip_500_1"},
+        {"source_paragraph": "ip_missing", "target_paragraph": "ip_500_1"},
+    ]
+    verify.clear_caches()
+    with patch.object(verify, "execute_query", side_effect=fake_query) as mock_query:
+        result = verify.relation_verify(relations)
+
+        assert mock_query.call_count == 2, f"Expected 2 queries, got {mock_query.call_count}"
+        assert [d["preserved"] for d in result["details"]] == [True, True, False, False]
+        assert result["details"][3]["reason"] == "source paragraph not found"
+
+        # Endpoints resolve from the memo on the next call; only edges are queried
+        assert verify.relation_verify(relations) == result
+        assert mock_query.call_count == 3, f"Expected 3 queries, got {mock_query.call_count}"
+    verify.clear_caches()
+
+    print("PASS: Relation verify batches edge lookups")
+
+
 # ============================================================
 # Context — Role Caps Enforcement
 # ============================================================
@@ -608,6 +1089,19 @@ if __name__ == '__main__':
     tests = [
         test_tool_registration,
         test_rrf_fusion,
+        test_rrf_fusion_counts_repeated_ids_once,
+        test_resolve_paragraph_id_is_cached,
+        test_hop_retrieve_arrow_matches_dicts,
+        test_parse_isa_ref,
+        test_related_lookup_failure_is_retried,
+        test_paragraph_lookups_return_copies,
+        test_query_embedding_is_cached,
+        test_concurrent_query_embeddings_share_one_call,
+        test_embedding_batcher_sends_lone_requests_at_once,
+        test_embedding_batcher_coalesces_pending_requests,
+        test_guide_filter_pushed_into_vector_search,
+        test_hybrid_keyword_shortcircuit,
+        test_search_result_cache_returns_copies,
         test_cross_reference_extraction,
         test_cross_reference_with_paragraph_numbers,
         test_cross_reference_empty,
@@ -617,12 +1111,15 @@ if __name__ == '__main__':
         test_contradiction_patterns,
         test_no_false_contradictions,
         test_web_search_no_api_key,
+        test_web_search_runs_queries_concurrently,
         test_relevance_scoring,
         test_relevance_scoring_term_overlap,
         test_db_path_resolution,
         test_entity_verify_scoring,
         test_citation_verify_term_overlap,
+        test_citation_verify_batches_lookups,
         test_relation_verify_implicit,
+        test_relation_verify_batches_edge_lookups,
         test_context_role_caps,
         test_format_context_xml_structure,
     ]